@@ -0,0 +1,190 @@
+# A reproducible benchmark of our solvers.
+# Boards come from seeded generators (see modules/Generator.py), so every run of the same command solves the same
+# boards. For every solver and board size we record the wall time, nodes/sec, peak memory, max frontier size and
+# closed set size, and write one row per solve to CSV and everything (settings, rows and a summary) to JSON, so
+# results can be compared between versions.
+#
+# Example: python benchmark.py --sizes 3x3 --kinds uniform,walk,hardest --algorithms md,bidirectional --count 20
+# IDA* and anytime search take their heuristic after a colon, e.g. --algorithms ida:md,ida:wd,anytime:lc, and the
+# pattern database can look up mirror images too, w/ pdb:mirror.
+# --verify checks every optimal solver's solutions against the distance table of each board size (see
+# modules/DistanceTable.py, built on first use), e.g. python benchmark.py --algorithms pdb,pdb:mirror --verify
+import argparse
+import csv
+import json
+import platform
+import time
+import tracemalloc
+# Importing our classes.
+from modules.State import State
+from modules.Problem import Problem
+from modules.Generator import Generator
+from modules.ClosedSet import ClosedSet
+from modules.DistanceTable import DistanceTable
+
+# The algorithms that run on our best-first search core, and so can be benchmarked w/ each frontier and closed set.
+frontier_algorithms = ('ucs', 'md', 'mt', 'euc', 'lc', 'wd', 'pdb', 'weighted_md', 'greedy_md')
+# The algorithms whose solutions are always optimal, which --verify checks.
+optimal_algorithms = ('ucs', 'md', 'mt', 'euc', 'lc', 'wd', 'pdb', 'table', 'ida', 'bidirectional', 'layered', 'anytime')
+
+# Builds the instance set for one board size: a list of (kind, board) pairs.
+def make_instances(goal_state, kinds, count, walk_length, seed):
+    generator = Generator(goal_state, seed)
+    instances = []
+    for kind in kinds:
+        if kind == 'uniform':
+            boards = generator.uniform(count)
+        elif kind == 'walk':
+            boards = generator.random_walk(count, walk_length)
+        elif kind == 'hardest':
+            boards = generator.hardest()
+        else:
+            raise ValueError(f"Unknown instance kind '{kind}', expected 'uniform', 'walk' or 'hardest'.")
+        instances += [(kind, puzzle) for puzzle in boards]
+    return instances
+
+# Solves one board and measures it. The timed run and the memory run are separate,
+# as tracing allocations slows Python down far too much to time the same run.
+def measure(puzzle, goal_state, algorithm, frontier, closed, track_memory):
+    rows, cols = len(goal_state), len(goal_state[0])
+    options = {'frontier': frontier, 'closed': closed} if algorithm in frontier_algorithms else {}
+    if ':' in algorithm:
+        algorithm, variant = algorithm.split(':')
+        if algorithm == 'pdb':
+            options['mirror'] = variant == 'mirror'
+        else:
+            options['heuristic'] = variant
+    problem = Problem(State(puzzle, rows, cols), goal_state)
+    start = time.perf_counter()
+    moves = problem.run(algorithm, **options)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = None
+    if track_memory:
+        tracemalloc.start()
+        Problem(State(puzzle, rows, cols), goal_state).run(algorithm, **options)
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    return {
+        'moves': moves,
+        'nodes_expanded': problem.nodes_expanded,
+        'nodes_generated': problem.stats.generated,
+        'stale': problem.stats.stale,
+        'max_nodes': problem.max_nodes,
+        'time': elapsed,
+        'nodes_per_sec': problem.nodes_expanded / elapsed if elapsed > 0 else 0.0,
+        'peak_kb': peak_kb,
+        'closed_kb': ClosedSet.memory(problem.was_seen) / 1024,
+    }
+
+# Sums up the rows of every (size, kind, algorithm, frontier, closed set) group.
+def summarize(rows):
+    groups = {}
+    for row in rows:
+        key = (row['size'], row['kind'], row['algorithm'], row['frontier'], row['closed'])
+        groups.setdefault(key, []).append(row)
+    summary = []
+    for (size, kind, algorithm, frontier, closed), group in groups.items():
+        total_time = sum(row['time'] for row in group)
+        total_nodes = sum(row['nodes_expanded'] for row in group)
+        peaks = [row['peak_kb'] for row in group if row['peak_kb'] is not None]
+        summary.append({
+            'size': size,
+            'kind': kind,
+            'algorithm': algorithm,
+            'frontier': frontier,
+            'closed': closed,
+            'boards': len(group),
+            'mean_time': total_time / len(group),
+            'nodes_per_sec': total_nodes / total_time if total_time > 0 else 0.0,
+            'mean_nodes_expanded': total_nodes / len(group),
+            'max_frontier': max(row['max_nodes'] for row in group),
+            'max_peak_kb': max(peaks) if peaks else None,
+            'max_closed_kb': max(row['closed_kb'] for row in group),
+        })
+    return summary
+
+# Prints our summary as a plain table.
+def print_summary(summary):
+    header = (f"{'size':<6}{'kind':<9}{'algorithm':<15}{'frontier':<9}{'closed':<8}{'boards':>7}{'mean ms':>11}{'nodes/s':>11}"
+              f"{'mean nodes':>12}{'max front.':>11}{'peak KB':>10}{'closed KB':>11}")
+    print(header)
+    print('-' * len(header))
+    for row in summary:
+        peak = f"{row['max_peak_kb']:.0f}" if row['max_peak_kb'] is not None else '-'
+        print(f"{row['size']:<6}{row['kind']:<9}{row['algorithm']:<15}{row['frontier']:<9}{row['closed']:<8}{row['boards']:>7}"
+              f"{row['mean_time'] * 1000:>11.2f}{row['nodes_per_sec']:>11.0f}{row['mean_nodes_expanded']:>12.0f}"
+              f"{row['max_frontier']:>11}{peak:>10}{row['max_closed_kb']:>11.0f}")
+    # How much memory the other closed sets save over dicts, for the groups we ran w/ both.
+    dicts = {(row['size'], row['kind'], row['algorithm'], row['frontier']): row for row in summary if row['closed'] == 'dict'}
+    for row in summary:
+        base = dicts.get((row['size'], row['kind'], row['algorithm'], row['frontier']))
+        if row['closed'] not in ('dict', '-') and base and row['max_closed_kb'] > 0:
+            print(f"{row['size']} {row['kind']} {row['algorithm']}/{row['frontier']}: the {row['closed']} closed set takes "
+                  f"{row['max_closed_kb']:.0f} KB instead of {base['max_closed_kb']:.0f} KB "
+                  f"({base['max_closed_kb'] / row['max_closed_kb']:.1f}x smaller) in {row['mean_time'] / base['mean_time']:.1f}x the time")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the puzzle solvers on seeded instance sets.")
+    parser.add_argument('--sizes', default='3x3', help="comma separated board sizes, e.g. 3x3,4x4")
+    parser.add_argument('--kinds', default='uniform,walk,hardest', help="comma separated instance kinds: uniform, walk, hardest")
+    parser.add_argument('--algorithms', default='ucs,md,mt,euc,lc,wd,bidirectional,ida', help="comma separated algorithms (see Problem.algorithms)")
+    parser.add_argument('--frontiers', default='heap,bucket', help="comma separated frontiers for best-first algorithms: heap, bucket, indexed")
+    parser.add_argument('--closed-sets', default='dict', help="comma separated closed sets for best-first algorithms: dict, ranked, auto")
+    parser.add_argument('--count', type=int, default=10, help="boards per generated kind")
+    parser.add_argument('--walk-length', type=int, default=30, help="moves per random walk")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the instance generators")
+    parser.add_argument('--no-memory', action='store_true', help="skip the (slower) peak memory runs")
+    parser.add_argument('--verify', action='store_true', help="check optimal solvers against the distance table of each size")
+    parser.add_argument('--label', default='', help="a label stored w/ the results, e.g. a version")
+    parser.add_argument('--csv', default='benchmark.csv', help="where to write one row per solve")
+    parser.add_argument('--json', default='benchmark.json', help="where to write the settings, rows and summary")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes.split(','):
+        board_rows, board_cols = (int(part) for part in size.split('x'))
+        goal_state = Generator.standard_goal(board_rows, board_cols)
+        # The hardest set is only known for the 8 puzzle.
+        kinds = [kind for kind in args.kinds.split(',') if kind != 'hardest' or size == '3x3']
+        instances = make_instances(goal_state, kinds, args.count, args.walk_length, args.seed)
+        table = DistanceTable.build_for(Problem(State(goal_state, board_rows, board_cols), goal_state).board) if args.verify else None
+        for algorithm in args.algorithms.split(','):
+            frontiers = args.frontiers.split(',') if algorithm in frontier_algorithms else ['-']
+            closed_sets = args.closed_sets.split(',') if algorithm in frontier_algorithms else ['-']
+            for frontier in frontiers:
+                # The Euclidean heuristic isn't integral, so it can't use buckets.
+                if algorithm == 'euc' and frontier == 'bucket':
+                    continue
+                for closed in closed_sets:
+                    for index, (kind, puzzle) in enumerate(instances):
+                        result = measure(puzzle, goal_state, algorithm, frontier, closed, not args.no_memory)
+                        optimal = None
+                        if table is not None and algorithm.split(':')[0] in optimal_algorithms:
+                            optimal = table.distance(table.board.encode(puzzle))
+                        rows.append({'size': size, 'kind': kind, 'index': index, 'algorithm': algorithm,
+                                     'frontier': frontier, 'closed': closed, 'board': json.dumps(puzzle), **result,
+                                     'optimal': optimal})
+
+    summary = summarize(rows)
+    print_summary(summary)
+
+    with open(args.csv, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0].keys()) if rows else ['size'])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(args.json, 'w') as file:
+        settings = {**vars(args), 'python': platform.python_version(), 'machine': platform.machine(), 'time': time.time()}
+        json.dump({'settings': settings, 'rows': rows, 'summary': summary}, file, indent=2)
+    if args.verify:
+        wrong = [row for row in rows if row['optimal'] is not None and row['moves'] != row['optimal']]
+        for row in wrong:
+            print(f"{row['size']} {row['algorithm']}/{row['frontier']}/{row['closed']} solved {row['board']} in "
+                  f"{row['moves']} moves, but the optimal solution takes {row['optimal']}.")
+        print(f"{len(wrong)} of {sum(row['optimal'] is not None for row in rows)} optimal solves were not optimal.")
+        if wrong:
+            raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
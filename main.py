@@ -1,6 +1,8 @@
 # Importing our State class from State.py.
 from modules.State import State
 from modules.Problem import Problem
+from modules.Reporter import ConsoleReporter
+from modules.Generator import Generator
 
 # Different initial states for the 8 puzzle problem: ( A 0 represents the empty tile )
 init_state = [[1,0,3],
@@ -35,28 +37,37 @@ goal_state = [[1,2,3],
               [4,5,6],
               [7,8,0]]
 
+# How we name the rows we ask for.
+ordinals = ['first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth']
+
 print("\nWelcome to our 8-puzzle solver.")
 option = input("Type '1' to use a default puzzle, or '2' to enter your own puzzle.\nYour choice: ")
 
 if option == '2':
+    # Any rows x cols puzzle works, e.g. 4 4 for the 15 puzzle; the goal is the tiles in order w/ the blank last.
+    size = input("\nEnter the number of rows and columns of your puzzle, or press Enter for 3 3: ").split()
+    rows, cols = (int(size[0]), int(size[1])) if size else (3, 3)
+    goal_state = Generator.standard_goal(rows, cols)
+
     print("\nEnter your puzzle, use a zero to represent the blank.")
-    row_1 = input("Enter the first row, use spaces or tabs between numbers: ")
-    row_1 = [int(item) for item in row_1.split()]
-    row_2 = input("Enter the second row, use spaces or tabs between numbers: ")
-    row_2 = [int(item) for item in row_2.split()]
-    row_3 = input("Enter the third row, use spaces or tabs between numbers: ")
-    row_3 = [int(item) for item in row_3.split()]
-
-    puzzle = [row_1, row_2, row_3]
+    puzzle = []
+    for row in range(rows):
+        name = ordinals[row] if row < len(ordinals) else f"#{row + 1}"
+        entered = input(f"Enter the {name} row, use spaces or tabs between numbers: ")
+        puzzle.append([int(item) for item in entered.split()])
+
     print("\nEnter your algorithm of choice:")
     print("1. Uniform Cost Search")
     print("2. A* with the Manhattan Distance Heuristic")
     print("3. A* with the Euclidean Distance Heuristic")
     print("4. A* with the Misplaced Tiles Heuristic")
+    print("5. IDA* with the Manhattan Distance Heuristic (best for 4x4 and larger)")
     choice = input("\nYour choice: ")
 
     state = State(puzzle)
     problem = Problem(state, goal_state)
+    # Our solver is silent, so we print its results to the console.
+    problem.reporter = ConsoleReporter()
 
     if choice == '1':
         problem.solve_using_ucs()
@@ -66,6 +77,8 @@ if option == '2':
         problem.solve_using_euc()
     elif choice == '4':
         problem.solve_using_mt()
+    elif choice == '5':
+        problem.solve_using_ida()
     else:
         print("Invalid choice. Aborting...")
 else:
@@ -74,6 +87,7 @@ else:
 
     # Creating a Problem object with our initial state and goal state.
     problem = Problem(state, goal_state)
+    problem.reporter = ConsoleReporter()
 
     # Solving the 8 puzzle problem using UCS.
     #problem.solve_using_ucs()
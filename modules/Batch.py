@@ -0,0 +1,97 @@
+# Solving many boards at once.
+# Boards are split into chunks and fanned out across a pool of worker processes, and results are yielded as soon
+# as each chunk completes. Read-only lookup tables (pattern databases, distance tables) are never sent to the
+# workers: each worker memory-maps them from disk once, when it starts, and reuses them for every board.
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+# Importing our classes.
+from modules.State import State
+from modules.Problem import Problem
+from modules.Board import Board
+from modules.PatternDatabase import PatternDatabase
+from modules.DistanceTable import DistanceTable
+try:
+    from modules.Vectorized import VectorHeuristic
+except ImportError:
+    # NumPy is optional; without it we can't order batches by difficulty.
+    VectorHeuristic = None
+
+# Opens any table an algorithm needs. We run it once before the pool starts, so workers don't all build the
+# same table at once, and then once in every worker so the tables stay warm across tasks.
+def prepare_tables(goal_state, rows, cols, algorithm, options):
+    board = Board(goal_state, rows, cols)
+    if algorithm == 'pdb':
+        PatternDatabase.open(board, options.get('patterns'), options.get('path'), options.get('mirror', False))
+    elif algorithm == 'table':
+        DistanceTable.open(board, options.get('path'))
+
+# Solves a single board quietly, returning its result as a dictionary.
+def solve_board(index, puzzle, goal_state, rows, cols, algorithm, options):
+    start = time.perf_counter()
+    result = Problem(State(puzzle, rows, cols), goal_state).solve(algorithm, **options)
+    return {
+        'index': index,
+        'board': puzzle,
+        'algorithm': algorithm,
+        'moves': result.moves,
+        'solution': ''.join(result.solution),
+        'nodes_expanded': result.nodes_expanded,
+        'max_nodes': result.max_nodes,
+        'time': time.perf_counter() - start,
+        'stats': result.stats.as_dict(),
+    }
+
+# Orders boards by their Manhattan distance, largest first, as (index, board) pairs. Deep boards take the longest
+# to solve, so starting them first keeps a few slow chunks from straggling at the end of the batch.
+# The whole batch is scored in one vectorized call (see Vectorized.py).
+def order_hardest_first(boards, goal_state):
+    if VectorHeuristic is None:
+        raise ValueError("Ordering boards hardest first needs NumPy.")
+    boards = list(boards)
+    if not boards:
+        return []
+    board = Board(goal_state, len(goal_state), len(goal_state[0]))
+    vectorized = VectorHeuristic(board)
+    h_vals = vectorized.evaluate(vectorized.to_array(boards), 'md')
+    # A stable sort, so equally deep boards keep their input order.
+    return [(int(index), boards[index]) for index in (-h_vals).argsort(kind='stable')]
+
+# Solves a chunk of (index, board) pairs inside a worker.
+def solve_chunk(chunk, goal_state, rows, cols, algorithm, options):
+    return [solve_board(index, puzzle, goal_state, rows, cols, algorithm, options) for index, puzzle in chunk]
+
+# Solves an iterable of boards with one algorithm (see Problem.get_solver for the names and options),
+# yielding a result dictionary per board as soon as it is ready. Results carry the board's index in the input,
+# as they arrive in completion order rather than input order.
+#
+# workers:       the number of worker processes (defaults to the number of cores); 1 solves in this process.
+# chunksize:     the number of boards sent to a worker at once; larger chunks mean less inter-process overhead.
+# hardest_first: start the deepest boards first (see order_hardest_first). This reads the whole input up front.
+def solve_batch(boards, goal_state, algorithm='md', workers=None, chunksize=16, hardest_first=False, **options):
+    rows, cols = len(goal_state), len(goal_state[0])
+    workers = workers or os.cpu_count() or 1
+    setup = (goal_state, rows, cols, algorithm, options)
+    prepare_tables(*setup)
+    boards = iter(order_hardest_first(boards, goal_state)) if hardest_first else enumerate(boards)
+
+    if workers == 1:
+        for index, puzzle in boards:
+            yield solve_board(index, puzzle, *setup)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=prepare_tables, initargs=setup) as executor:
+        # We only keep a couple of chunks per worker in flight, so huge (or endless) inputs never pile up in memory.
+        pending = set()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(itertools.islice(boards, chunksize))
+                if not chunk:
+                    break
+                pending.add(executor.submit(solve_chunk, chunk, *setup))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
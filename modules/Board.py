@@ -0,0 +1,247 @@
+# A class describing the shape of our puzzle and how boards are packed into integers.
+# Every board is stored as a single integer where each tile gets a fixed number of bits,
+# which makes copying, hashing and comparing boards much cheaper than nested lists.
+
+class Board:
+    # The neighbor tables of every board shape we've seen, keyed by (rows, cols) and shared by all boards of that shape.
+    shapes = {}
+    # The popcount tables of every board size we've seen, keyed by size.
+    popcounts_by_size = {}
+
+    def __init__(self, goal_state, rows=3, cols=3):
+        # The dimensions of our puzzle.
+        self.rows = rows
+        self.cols = cols
+        # The number of cells on the board.
+        self.size = rows * cols
+        # The number of bits needed to store a single tile (4 bits for the 8 and 15 puzzles).
+        self.bits = max(1, (self.size - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        # The bit offset of every cell, so we don't multiply on every lookup.
+        self.shifts = [pos * self.bits for pos in range(self.size)]
+        # The goal position (row, col) of every tile, indexed by tile.
+        self.goal_tiles = self.flatten(goal_state)
+        self.check_tiles(goal_state, "goal state")
+        self.goal_pos = [None] * self.size
+        for pos, tile in enumerate(self.goal_tiles):
+            self.goal_pos[tile] = divmod(pos, cols)
+        # The blank's moves, named by the direction it travels, and their 2-bit move codes (the index in move_names).
+        self.move_names = 'UDLR'
+        self.move_offsets = [-cols, cols, -1, 1]
+        # The cells next to every cell (i.e. the tiles that can slide into the blank when it sits there),
+        # and the same cells paired w/ their move codes, for searches that record how each state was reached.
+        self.neighbors, self.neighbor_moves = self.adjacency(rows, cols)
+        # Our goal state packed into an integer.
+        self.goal = self.pack(self.goal_tiles)
+        # Factorials used to rank boards, and the number of solvable boards (size! / 2).
+        self.factorials = [1]
+        for i in range(1, self.size):
+            self.factorials.append(self.factorials[-1] * i)
+        self.reachable = self.factorials[-1] * self.size // 2
+        # The number of tiles in every set of tiles (as a bit mask), so ranking counts the tiles it has passed in O(1).
+        # Boards too large to rank into tables get by w/o it.
+        self.popcounts = self.popcount_table(self.size) if self.size <= 16 else None
+        # Square boards whose blank belongs on the diagonal are symmetric: transposing a board and relabeling each
+        # tile as the tile whose goal cell is the transpose of its own maps the goal onto itself, and so maps every
+        # board onto a mirror w/ the same optimal distance (whose moves are ours w/ U<->L and D<->R swapped).
+        goal_i, goal_j = self.goal_pos[0]
+        self.symmetric = rows == cols and goal_i == goal_j
+        if self.symmetric:
+            # The cell each cell transposes to, and the label each tile takes in the mirror.
+            self.transposed_cells = [(pos % cols) * cols + pos // cols for pos in range(self.size)]
+            self.relabel = [self.goal_tiles[j * cols + i] for i, j in self.goal_pos]
+
+    # The number of set bits of every mask of size bits, computed once per size.
+    @classmethod
+    def popcount_table(cls, size):
+        if size not in cls.popcounts_by_size:
+            counts = bytearray(1 << size)
+            for mask in range(1, 1 << size):
+                counts[mask] = counts[mask >> 1] + (mask & 1)
+            cls.popcounts_by_size[size] = bytes(counts)
+        return cls.popcounts_by_size[size]
+
+    # The neighbor tables of a board shape, computed once per shape.
+    @classmethod
+    def adjacency(cls, rows, cols):
+        if (rows, cols) not in cls.shapes:
+            neighbors = []
+            for pos in range(rows * cols):
+                i, j = divmod(pos, cols)
+                adjacent = []
+                for x_offset, y_offset in [(0,1), (0,-1), (1,0), (-1,0)]:
+                    new_x, new_y = i + x_offset, j + y_offset
+                    if 0 <= new_x < rows and 0 <= new_y < cols:
+                        adjacent.append(new_x * cols + new_y)
+                neighbors.append(adjacent)
+            neighbor_moves = [[(pos, cls.direction(src, pos, cols)) for pos in adjacent] for src, adjacent in enumerate(neighbors)]
+            cls.shapes[rows, cols] = neighbors, neighbor_moves
+        return cls.shapes[rows, cols]
+
+    # Checks that a 2D board has our shape and holds every tile exactly once.
+    def check_tiles(self, state, name="board"):
+        if len(state) != self.rows or any(len(row) != self.cols for row in state):
+            raise ValueError(f"The {name} must have {self.rows} rows of {self.cols} tiles.")
+        if sorted(self.flatten(state)) != list(range(self.size)):
+            raise ValueError(f"The {name} must hold each of the tiles 0 to {self.size - 1} exactly once.")
+
+    # Flattens a 2D board into a list of tiles.
+    def flatten(self, state):
+        return [tile for row in state for tile in row]
+
+    # Packs a flat list of tiles into an integer.
+    def pack(self, tiles):
+        code = 0
+        for pos, tile in enumerate(tiles):
+            code |= tile << self.shifts[pos]
+        return code
+
+    # Unpacks an integer into a flat list of tiles.
+    def unpack(self, code):
+        mask = self.mask
+        return [(code >> shift) & mask for shift in self.shifts]
+
+    # Packs a 2D board into an integer.
+    def encode(self, state):
+        return self.pack(self.flatten(state))
+
+    # Unpacks an integer into a 2D board.
+    def decode(self, code):
+        tiles = self.unpack(code)
+        return [tiles[i:i + self.cols] for i in range(0, self.size, self.cols)]
+
+    # Retrieves the tile stored in a cell.
+    def tile_at(self, code, pos):
+        return (code >> self.shifts[pos]) & self.mask
+
+    # Finds the cell holding the empty tile.
+    def find_blank(self, code):
+        mask = self.mask
+        for pos, shift in enumerate(self.shifts):
+            if (code >> shift) & mask == 0:
+                return pos
+
+    # Slides the tile in cell pos into the empty cell blank and returns the new board.
+    # As the blank is stored as zero, we only need to move the tile's bits across.
+    def slide(self, code, blank, pos):
+        tile = (code >> self.shifts[pos]) & self.mask
+        return code ^ (tile << self.shifts[pos]) ^ (tile << self.shifts[blank])
+
+    # Counts the inversions in a list of numbers with a merge sort, in O(n log n).
+    def count_inversions(self, values):
+        if len(values) < 2:
+            return 0, values
+        middle = len(values) // 2
+        left_count, left = self.count_inversions(values[:middle])
+        right_count, right = self.count_inversions(values[middle:])
+        count = left_count + right_count
+        merged = []
+        i = j = 0
+        while i < len(left) and j < len(right):
+            if left[i] <= right[j]:
+                merged.append(left[i])
+                i += 1
+            else:
+                # Every value left in the left half is larger than right[j].
+                count += len(left) - i
+                merged.append(right[j])
+                j += 1
+        merged.extend(left[i:])
+        merged.extend(right[j:])
+        return count, merged
+
+    # Checks whether a packed board can reach our goal state.
+    # Every slide swaps the blank with a tile, flipping the parity of the permutation (relative to the goal)
+    # and the parity of the blank's distance from its goal cell at the same time, so the two parities must match.
+    # This holds for any rows x cols and any goal layout.
+    def is_solvable(self, code):
+        tiles = self.unpack(code)
+        goal_index = [0] * self.size
+        for pos, tile in enumerate(self.goal_tiles):
+            goal_index[tile] = pos
+        inversions, _ = self.count_inversions([goal_index[tile] for tile in tiles])
+        blank_i, blank_j = divmod(tiles.index(0), self.cols)
+        goal_i, goal_j = self.goal_pos[0]
+        blank_distance = abs(blank_i - goal_i) + abs(blank_j - goal_j)
+        return inversions % 2 == blank_distance % 2
+
+    # Ranks a solvable board into 0 .. size!/2 - 1, a perfect hash of the states reachable from the goal.
+    # We take the blank's cell and the Lehmer code of the other tiles: for a fixed blank, swapping the last two
+    # tiles flips solvability and only changes the lowest digit, so halving the Lehmer code keeps ranks unique.
+    # (An unsolvable board shares its rank with a solvable one, so check is_solvable first.)
+    def rank(self, code):
+        shifts, mask, popcounts = self.shifts, self.mask, self.popcounts
+        count = self.size - 1
+        seen = lehmer = index = blank = 0
+        for pos in range(self.size):
+            tile = (code >> shifts[pos]) & mask
+            if not tile:
+                blank = pos
+                continue
+            # The tile's Lehmer digit counts the smaller tiles after it, i.e. the smaller tiles we haven't passed yet.
+            below = seen & ((1 << tile) - 1)
+            smaller = tile - 1 - (popcounts[below] if popcounts else bin(below).count('1'))
+            # Horner's rule over the factorial number system: the digit of the i-th tile is worth (count - 1 - i)!.
+            lehmer = lehmer * (count - index) + smaller
+            seen |= 1 << tile
+            index += 1
+        return blank * (self.factorials[count] // 2) + lehmer // 2
+
+    # The packed board of a rank (see rank), on the solvable or the unsolvable side of the parity split.
+    def unrank(self, rank, solvable=True):
+        count = self.size - 1
+        blank, half = divmod(rank, self.factorials[count] // 2)
+        # The two Lehmer codes that halve to our rank differ by a swap of the last two tiles, which flips solvability.
+        for lehmer in (half * 2, half * 2 + 1):
+            remaining = list(range(1, self.size))
+            tiles = []
+            for i in range(count):
+                digit, lehmer = divmod(lehmer, self.factorials[count - 1 - i])
+                tiles.append(remaining.pop(digit))
+            tiles.insert(blank, 0)
+            code = self.pack(tiles)
+            if self.is_solvable(code) == solvable:
+                return code
+
+    # The mirror image of a packed board (see symmetric).
+    def transpose(self, code):
+        tiles = self.unpack(code)
+        mirrored = [0] * self.size
+        for pos, tile in enumerate(tiles):
+            mirrored[self.transposed_cells[pos]] = self.relabel[tile]
+        return self.pack(mirrored)
+
+    # The representative of a board's symmetry class: the smaller of the board and its mirror.
+    # Returns (code, transposed), where transposed tells whether the representative is the mirror.
+    # Boards of asymmetric layouts are their own representative.
+    def canonical(self, code):
+        if not self.symmetric:
+            return code, False
+        mirror = self.transpose(code)
+        return (mirror, True) if mirror < code else (code, False)
+
+    # Maps a list of move names between a board and its mirror (the mapping is its own inverse).
+    def mirror_moves(self, moves):
+        names = self.move_names
+        return [names[names.index(move) ^ 2] for move in moves]
+
+    # The 2-bit code of the move that takes the blank from cell src to the neighboring cell dst.
+    def move_code(self, src, dst):
+        return self.direction(src, dst, self.cols)
+
+    # The 2-bit code of a move between neighboring cells on a board w/ the given number of columns.
+    @staticmethod
+    def direction(src, dst, cols):
+        src_i, src_j = divmod(src, cols)
+        dst_i, dst_j = divmod(dst, cols)
+        if dst_i != src_i:
+            return 0 if dst_i < src_i else 1
+        return 2 if dst_j < src_j else 3
+
+    # Names the moves of a blank that starts in cell blank and then travels through the given cells.
+    def path_to_moves(self, blank, cells):
+        moves = []
+        for pos in cells:
+            moves.append(self.move_names[self.move_code(blank, pos)])
+            blank = pos
+        return moves
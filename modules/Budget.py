@@ -0,0 +1,58 @@
+# Limits on a single search: a maximum number of expansions, a wall-clock deadline, and a cancellation token
+# another thread can use to stop the search. Searches check their budget once before they start, then only every
+# check_every expansions (every layer, for bidirectional and layered search), so the limits cost nothing in the inner
+# loop and may overshoot a little.
+#
+# Usage: problem.solve('ucs', budget=Budget(max_expansions=100000, timeout=0.5, token=token))
+import time
+
+class CancellationToken:
+    def __init__(self):
+        self.cancelled = False
+
+    # Asks every search holding this token to stop at its next check.
+    def cancel(self):
+        self.cancelled = True
+
+
+class Budget:
+    # The reasons a search can run out of budget.
+    EXPANSIONS = 'max_expansions'
+    DEADLINE = 'deadline'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, max_expansions=None, timeout=None, deadline=None, token=None, check_every=1024):
+        # The most nodes a search may expand.
+        self.max_expansions = max_expansions
+        # The most seconds a search may run (counted from its start), and/or a time.monotonic() to stop by.
+        self.timeout = timeout
+        self.deadline = deadline
+        # A CancellationToken, checked along w/ the other limits.
+        self.token = token
+        # The number of expansions between checks.
+        self.check_every = check_every
+        self.stop_at = None
+
+    # Called when a search starts, to fix our deadline.
+    def start(self):
+        stops = [self.deadline] if self.deadline is not None else []
+        if self.timeout is not None:
+            stops.append(time.monotonic() + self.timeout)
+        self.stop_at = min(stops) if stops else None
+
+    # The expansion count at which a search should next check us, after expanded expansions.
+    def next_check(self, expanded):
+        next_check = expanded + self.check_every
+        if self.max_expansions is not None:
+            next_check = min(next_check, max(self.max_expansions, expanded + 1))
+        return next_check
+
+    # Returns why a search that has made expanded expansions must stop, or None if it may go on.
+    def exceeded(self, expanded):
+        if self.token is not None and self.token.cancelled:
+            return self.CANCELLED
+        if self.max_expansions is not None and expanded >= self.max_expansions:
+            return self.EXPANSIONS
+        if self.stop_at is not None and time.monotonic() >= self.stop_at:
+            return self.DEADLINE
+        return None
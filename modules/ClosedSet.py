@@ -0,0 +1,98 @@
+# The closed sets (parent maps) our searches can use. Both map every closed board to the 2-bit code of the move
+# that reached it (-1 for the root), which is all we need to rebuild a solution.
+#   dict:   a dict of packed boards, for any board size. About 100 bytes per board.
+#   ranked: two bit arrays indexed by the board's permutation rank (see Board.rank): one bit that says whether the
+#           board is closed and two for its move, i.e. 3 bits per reachable board whether we close it or not.
+#           The 8 puzzle's 181,440 boards fit in 68 KB, where closing all of them in a dict takes about 20 MB.
+#           Ranking a board costs more than hashing an integer, so this trades speed for memory. Our search core
+#           ranks each board once, when it's generated, and carries the rank in its frontier entry (see Problem.search).
+#           Its bit arrays are allocated up front, so it only saves memory on searches that close more than about
+#           700 boards of the 8 puzzle (shorter searches are better off w/ a dict).
+import sys
+
+class ClosedSet:
+    # The most reachable boards a ranked closed set is built for (its bit arrays take 3/8 of a byte per board).
+    max_ranked = 1 << 28
+
+    # Creates a closed set by name: 'dict', 'ranked', or 'auto' (ranked whenever the board is small enough).
+    @staticmethod
+    def create(kind, board):
+        if kind == 'auto':
+            kind = 'ranked' if board.reachable <= ClosedSet.max_ranked else 'dict'
+        if kind == 'dict':
+            return {}
+        if kind == 'ranked':
+            if board.reachable > ClosedSet.max_ranked:
+                raise ValueError(f"A ranked closed set of a {board.rows}x{board.cols} board would need {board.reachable} entries.")
+            return RankedClosedSet(board)
+        raise ValueError(f"Unknown closed set '{kind}', expected 'dict', 'ranked' or 'auto'.")
+
+    # The bytes a closed set takes up: for dicts, the table and its keys (the moves are small ints, which Python shares).
+    @staticmethod
+    def memory(closed):
+        if isinstance(closed, RankedClosedSet):
+            return closed.nbytes
+        return sys.getsizeof(closed) + sum(sys.getsizeof(code) for code in closed)
+
+
+class RankedClosedSet:
+    name = 'ranked'
+
+    def __init__(self, board):
+        self.board = board
+        self.rank = board.rank
+        # One bit per reachable board (whether it's closed), and two per board for its move.
+        self.closed = bytearray((board.reachable + 7) // 8)
+        self.moves = bytearray((board.reachable + 3) // 4)
+        # The rank of the root (whose move is -1), and whether it is solvable: ranks are only unique among boards
+        # on the same side of the parity split, which every board we search shares w/ the root.
+        self.root = None
+        self.solvable = True
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, code):
+        return self.has_rank(self.rank(code))
+
+    def __getitem__(self, code):
+        rank = self.rank(code)
+        if not self.closed[rank >> 3] >> (rank & 7) & 1:
+            raise KeyError(code)
+        if rank == self.root:
+            return -1
+        return self.moves[rank >> 2] >> ((rank & 3) << 1) & 3
+
+    def __setitem__(self, code, move):
+        self.close_rank(self.rank(code), code, move)
+
+    # Whether the board of a rank is closed, for searches that have already ranked it.
+    def has_rank(self, rank):
+        return bool(self.closed[rank >> 3] >> (rank & 7) & 1)
+
+    # Closes the board (code) of a rank, remembering the move that reached it, for searches that have already ranked it.
+    def close_rank(self, rank, code, move):
+        bit = 1 << (rank & 7)
+        if not self.closed[rank >> 3] & bit:
+            self.closed[rank >> 3] |= bit
+            self.count += 1
+        if move == -1:
+            self.root = rank
+            self.solvable = self.board.is_solvable(code)
+            move = 0
+        shift = (rank & 3) << 1
+        self.moves[rank >> 2] = (self.moves[rank >> 2] & ~(3 << shift) & 0xFF) | (move << shift)
+
+    # Our closed boards, in rank order.
+    def __iter__(self):
+        for index, byte in enumerate(self.closed):
+            while byte:
+                low = byte & -byte
+                yield self.board.unrank((index << 3) + low.bit_length() - 1, self.solvable)
+                byte ^= low
+
+    # The bytes our bit arrays take up.
+    @property
+    def nbytes(self):
+        return len(self.closed) + len(self.moves)
@@ -0,0 +1,125 @@
+# A perfect-distance table: the exact number of moves from every solvable board to one goal layout.
+# We fill it once with a breadth-first search from the goal, indexed by Board.rank, one byte per board
+# (181,440 bytes for the 8 puzzle). After that any optimal distance is a single lookup, and an optimal path
+# can be walked greedily by always sliding into a neighbor that is one move closer.
+#
+# Only small boards are practical: the table holds size!/2 entries.
+import os
+import struct
+from collections import deque
+# Importing the file format our tables share.
+from modules.TableFile import TableFile
+try:
+    from modules.LayerBFS import LayerBFS
+except ImportError:
+    # NumPy is optional; without it we build tables w/ a plain breadth-first search.
+    LayerBFS = None
+
+class DistanceTable(TableFile):
+    # The first bytes of every table file.
+    magic = b'DST1'
+    # Marks boards the search never reached.
+    unknown = 0xFF
+    # The most entries of a table we build on first use: a breadth-first search over 16 million boards takes minutes.
+    max_built = 1 << 24
+    # The tables this process has already loaded, so repeated solves (e.g. in a batch worker) share them.
+    opened = {}
+
+    def __init__(self, board, path=None):
+        # The board layout (dimensions and goal) our distances lead to.
+        self.board = board
+        # Where our table lives on disk.
+        self.path = path or os.path.join(self.default_directory, self.default_filename(board))
+        # Our distances, indexed by Board.rank.
+        self.table = None
+
+    # A file name unique to the board shape and goal layout.
+    @staticmethod
+    def default_filename(board):
+        goal = ''.join(format(tile, 'x') for tile in board.goal_tiles)
+        return f"distances_{board.rows}x{board.cols}_{goal}.bin"
+
+    # Opens the table for a board's goal, reusing it if this process already has it open. Tables nobody has built yet
+    # are built and saved first (w/ build, and only for boards of up to max_built entries); otherwise we return None.
+    @classmethod
+    def open(cls, board, path=None, build=True):
+        table = cls(board, path)
+        key = (board.rows, board.cols, tuple(board.goal_tiles), table.path)
+        def create():
+            if table.load():
+                return table
+            if not build or board.reachable > cls.max_built:
+                return None
+            return cls.build_for(board, path)
+        return cls.reuse(key, create)
+
+    # Loads the table for a board's goal from disk, or returns None if nobody has built it.
+    @classmethod
+    def find(cls, board, path=None):
+        return cls.open(board, path, build=False)
+
+    # Loads the table for a board's goal from disk, building and saving it first if needed (w/ that many processes).
+    @classmethod
+    def build_for(cls, board, path=None, workers=1):
+        table = cls(board, path)
+        if not table.load():
+            table.save(table.build(workers))
+            if not table.load():
+                raise ValueError(f"Could not load the distance table at {table.path}.")
+        return table
+
+    # Fills the table with a breadth-first search from the goal: a layer at a time across worker processes when
+    # we have NumPy (see LayerBFS.py), or one board at a time.
+    def build(self, workers=1):
+        board = self.board
+        if LayerBFS is not None and board.size * board.bits <= 64:
+            return LayerBFS(board, workers).distances(board.goal, self.unknown)
+        table = bytearray([self.unknown]) * board.reachable
+        table[board.rank(board.goal)] = 0
+        queue = deque([(board.goal, board.find_blank(board.goal), 0)])
+        while queue:
+            code, empty_pos, moves = queue.popleft()
+            for pos in board.neighbors[empty_pos]:
+                new_state = board.slide(code, empty_pos, pos)
+                rank = board.rank(new_state)
+                if table[rank] == self.unknown:
+                    table[rank] = moves + 1
+                    queue.append((new_state, pos, moves + 1))
+        return table
+
+    # The header of our table file: the board shape and the goal layout.
+    def header(self):
+        return self.magic + struct.pack('<BB', self.board.rows, self.board.cols) + bytes(self.board.goal_tiles)
+
+    # Memory-maps our table from disk. Returns False if there is no usable table at our path.
+    def load(self):
+        entries = self.map_entries()
+        if entries is None or len(entries) != self.board.reachable:
+            return False
+        self.table = entries
+        return True
+
+    # The optimal number of moves from a packed board to the goal, or -1 if the goal can't be reached.
+    def distance(self, code):
+        if not self.board.is_solvable(code):
+            return -1
+        return self.table[self.board.rank(code)]
+
+    # Walks an optimal path from a packed board to the goal in O(depth).
+    # Returns the cells the blank moves through, or None if the goal can't be reached.
+    def solution(self, code):
+        moves = self.distance(code)
+        if moves == -1:
+            return None
+        board = self.board
+        empty_pos = board.find_blank(code)
+        path = []
+        while moves > 0:
+            # Some neighbor is always exactly one move closer to the goal.
+            for pos in board.neighbors[empty_pos]:
+                new_state = board.slide(code, empty_pos, pos)
+                if self.table[board.rank(new_state)] == moves - 1:
+                    break
+            code, empty_pos, moves = new_state, pos, moves - 1
+            path.append(pos)
+        return path
@@ -0,0 +1,170 @@
+# The open lists (frontiers) our search core can use.
+# All hand back the entry with the lowest priority first, and all count their entries in size.
+#   HeapFrontier:        a binary heap, which works for any priority (e.g. the Euclidean heuristic's floats).
+#   BucketFrontier:      one bucket per integer priority, for O(1) push and pop, breaking ties toward deeper g(n).
+#   IndexedHeapFrontier: a binary heap that holds each board once, lowering its priority in place (decrease-key)
+#                        when a better path to it is pushed, instead of leaving a stale duplicate behind.
+import heapq
+
+class Frontier:
+    # The number of pushes that updated an entry already in the frontier rather than adding one.
+    updates = 0
+
+    # Creates a frontier by name: 'heap', 'bucket', 'indexed', or 'auto' (buckets whenever every priority is an integer).
+    @staticmethod
+    def create(kind, integral):
+        if kind == 'auto':
+            kind = 'bucket' if integral else 'heap'
+        if kind == 'heap':
+            return HeapFrontier()
+        if kind == 'indexed':
+            return IndexedHeapFrontier()
+        if kind == 'bucket':
+            if not integral:
+                raise ValueError("A bucket frontier needs integer priorities.")
+            return BucketFrontier()
+        raise ValueError(f"Unknown frontier '{kind}', expected 'heap', 'bucket', 'indexed' or 'auto'.")
+
+
+class HeapFrontier(Frontier):
+    name = 'heap'
+
+    def __init__(self):
+        # Our min heap of (priority, id, entry); the id breaks ties in the order entries were pushed.
+        self.heap = []
+        self.count = 0
+        self.size = 0
+
+    def push(self, priority, gn, entry):
+        self.count += 1
+        self.size += 1
+        heapq.heappush(self.heap, (priority, self.count, entry))
+
+    def pop(self):
+        self.size -= 1
+        return heapq.heappop(self.heap)[2]
+
+    # Every entry waiting, in no particular order.
+    def entries(self):
+        return (item[2] for item in self.heap)
+
+
+class BucketFrontier(Frontier):
+    name = 'bucket'
+
+    def __init__(self):
+        # buckets[f][g] holds the entries w/ priority f and cost g. Within a priority we pop the deepest g first,
+        # which reaches the goal sooner on the last f-layer.
+        self.buckets = []
+        # No entry has a priority below min_f, so we only ever scan upwards from it.
+        self.min_f = 0
+        self.size = 0
+
+    def push(self, priority, gn, entry):
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        layer = buckets[priority]
+        while len(layer) <= gn:
+            layer.append([])
+        layer[gn].append(entry)
+        if priority < self.min_f:
+            self.min_f = priority
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        f = self.min_f
+        while True:
+            layer = buckets[f]
+            # Empty buckets at the deep end of a layer are dropped, so the last one is always the deepest entry.
+            while layer and not layer[-1]:
+                layer.pop()
+            if layer:
+                break
+            f += 1
+        self.min_f = f
+        self.size -= 1
+        return layer[-1].pop()
+
+    # Every entry waiting, in no particular order.
+    def entries(self):
+        return (entry for layer in self.buckets for bucket in layer for entry in bucket)
+
+
+class IndexedHeapFrontier(Frontier):
+    name = 'indexed'
+
+    def __init__(self):
+        # Our min heap of [priority, id, entry] lists, and the heap position of every board (entry[0]) in it.
+        self.heap = []
+        self.index = {}
+        self.count = 0
+        self.size = 0
+        self.updates = 0
+
+    def push(self, priority, gn, entry):
+        position = self.index.get(entry[0])
+        if position is not None:
+            # The board is already waiting: keep the better entry, moving it up the heap if its priority dropped.
+            item = self.heap[position]
+            if priority > item[0]:
+                return
+            item[0], item[2] = priority, entry
+            self.updates += 1
+            self.sift_up(position)
+            return
+        self.count += 1
+        self.size += 1
+        self.heap.append([priority, self.count, entry])
+        self.index[entry[0]] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.index[last[2][0]] = 0
+            self.sift_down(0)
+        del self.index[top[2][0]]
+        self.size -= 1
+        return top[2]
+
+    # Every entry waiting, in no particular order.
+    def entries(self):
+        return (item[2] for item in self.heap)
+
+    # Moves the item at position up until its parent is smaller. (Ids are unique, so entries are never compared.)
+    def sift_up(self, position):
+        heap, index = self.heap, self.index
+        item = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if not item < heap[parent]:
+                break
+            heap[position] = heap[parent]
+            index[heap[position][2][0]] = position
+            position = parent
+        heap[position] = item
+        index[item[2][0]] = position
+
+    # Moves the item at position down until both its children are larger.
+    def sift_down(self, position):
+        heap, index = self.heap, self.index
+        item = heap[position]
+        end = len(heap)
+        while True:
+            child = 2 * position + 1
+            if child >= end:
+                break
+            if child + 1 < end and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < item:
+                break
+            heap[position] = heap[child]
+            index[heap[position][2][0]] = position
+            position = child
+        heap[position] = item
+        index[item[2][0]] = position
@@ -0,0 +1,63 @@
+# Seeded generators of puzzle instances for benchmarking.
+# The same seed always produces the same boards, so runs can be compared across versions.
+import random
+# Importing our Board class.
+from modules.Board import Board
+
+class Generator:
+    # The two 8-puzzle boards that are 31 moves (the most possible) from the standard goal.
+    hardest_3x3 = [[[8,6,7],
+                    [2,5,4],
+                    [3,0,1]],
+                   [[6,4,7],
+                    [8,5,0],
+                    [3,2,1]]]
+
+    def __init__(self, goal_state, seed=0):
+        # The dimensions and goal layout of the boards we generate.
+        self.goal_state = goal_state
+        self.rows = len(goal_state)
+        self.cols = len(goal_state[0])
+        self.board = Board(goal_state, self.rows, self.cols)
+        # Our own random number generator, so other users of random don't change our boards.
+        self.random = random.Random(seed)
+
+    # The standard goal layout: the tiles in order, w/ the blank in the bottom right corner.
+    @staticmethod
+    def standard_goal(rows, cols):
+        tiles = list(range(1, rows * cols)) + [0]
+        return [tiles[i:i + cols] for i in range(0, rows * cols, cols)]
+
+    # Boards drawn uniformly at random from all solvable boards.
+    def uniform(self, count):
+        boards = []
+        for _ in range(count):
+            tiles = list(range(self.board.size))
+            self.random.shuffle(tiles)
+            # Swapping two tiles flips solvability, and pairs up the solvable and unsolvable boards one to one,
+            # so fixing the unsolvable half this way keeps the draw uniform.
+            if not self.board.is_solvable(self.board.pack(tiles)):
+                first, second = [pos for pos, tile in enumerate(tiles) if tile != 0][:2]
+                tiles[first], tiles[second] = tiles[second], tiles[first]
+            boards.append(self.board.decode(self.board.pack(tiles)))
+        return boards
+
+    # Boards reached by sliding length random tiles from the goal (never straight back), at most length moves away.
+    def random_walk(self, count, length):
+        boards = []
+        for _ in range(count):
+            code = self.board.goal
+            empty_pos = self.board.find_blank(code)
+            prev_pos = None
+            for _ in range(length):
+                pos = self.random.choice([pos for pos in self.board.neighbors[empty_pos] if pos != prev_pos])
+                code = self.board.slide(code, empty_pos, pos)
+                prev_pos, empty_pos = empty_pos, pos
+            boards.append(self.board.decode(code))
+        return boards
+
+    # The fixed set of hardest (31-move) boards. Only known for the standard 8-puzzle goal.
+    def hardest(self):
+        if self.goal_state != self.standard_goal(3, 3):
+            raise ValueError("The hardest boards are only known for the standard 3x3 goal.")
+        return [[row[:] for row in puzzle] for puzzle in self.hardest_3x3]
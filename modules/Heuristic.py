@@ -0,0 +1,248 @@
+# The heuristics used to guide our search.
+# A heuristic evaluates packed boards (see Board.py) from scratch, and also keeps a table of how its value
+# changes when a single tile slides, so children can be scored from their parent in O(1).
+
+class Heuristic:
+    # The short name of the heuristic, used in reports.
+    name = 'none'
+    # Whether h(n) can be updated from a per-tile delta table. Heuristics that look at several
+    # tiles at once (e.g. pattern databases) set this to False and are evaluated from scratch.
+    incremental = True
+    # Whether every h(n) is an integer, which lets the search use an integer bucket frontier.
+    integral = True
+
+    def __init__(self, board):
+        # The board layout (dimensions and goal) we are estimating distances for.
+        self.board = board
+        # The change in h(n) when a tile slides from cell src into cell dst, see delta_index.
+        self.deltas = self.build_deltas() if self.incremental else None
+
+    # The contribution of a single tile sitting in cell pos. (No heuristic: always 0.)
+    def tile_cost(self, tile, pos):
+        return 0
+
+    # Computes the heuristic value of a packed board from scratch.
+    def evaluate(self, code):
+        return self.evaluate_tiles(self.board.unpack(code))
+
+    # Computes the heuristic value of a flat list of tiles from scratch.
+    def evaluate_tiles(self, tiles):
+        h_val = 0
+        for pos, tile in enumerate(tiles):
+            if tile != 0:
+                h_val += self.tile_cost(tile, pos)
+        return h_val
+
+    # The position of (tile, src, dst) in our delta table.
+    def delta_index(self, tile, src, dst):
+        return (tile * self.board.size + src) * self.board.size + dst
+
+    # Builds a flat table of how h(n) changes when a tile slides into a neighboring cell.
+    def build_deltas(self):
+        board = self.board
+        table = [0] * (board.size * board.size * board.size)
+        for tile in range(1, board.size):
+            for src in range(board.size):
+                for dst in board.neighbors[src]:
+                    table[self.delta_index(tile, src, dst)] = self.tile_cost(tile, dst) - self.tile_cost(tile, src)
+        return table
+
+
+# No heuristic at all, which turns A* into Uniform Cost Search.
+class NoHeuristic(Heuristic):
+    name = 'ucs'
+
+
+# The Misplaced Tiles heuristic: the number of tiles not in their goal cell.
+class MisplacedHeuristic(Heuristic):
+    name = 'mt'
+
+    def tile_cost(self, tile, pos):
+        return 0 if self.board.goal_tiles[pos] == tile else 1
+
+
+# The Manhattan distance heuristic: the number of moves each tile is away from its goal cell.
+class ManhattanHeuristic(Heuristic):
+    name = 'md'
+
+    def tile_cost(self, tile, pos):
+        i, j = divmod(pos, self.board.cols)
+        goal_i, goal_j = self.board.goal_pos[tile]
+        return abs(i - goal_i) + abs(j - goal_j)
+
+
+# The Euclidean distance heuristic: the straight-line distance of each tile from its goal cell.
+class EuclideanHeuristic(Heuristic):
+    name = 'euc'
+    integral = False
+
+    def tile_cost(self, tile, pos):
+        i, j = divmod(pos, self.board.cols)
+        goal_i, goal_j = self.board.goal_pos[tile]
+        return (((i - goal_i) ** 2) + ((j - goal_j) ** 2)) ** .5
+
+
+# Manhattan distance plus linear conflicts: two tiles in their goal row (or column) but in the wrong order must
+# pass each other, which costs at least two extra moves per tile that has to leave the line. The fewest tiles to
+# move out of a line is its length minus the longest run of tiles already in increasing goal order, which we look
+# up in a table of every arrangement of a line, built once per board shape and goal.
+class LinearConflictHeuristic(ManhattanHeuristic):
+    name = 'lc'
+    # The conflicts of a line depend on all of its tiles, so we always evaluate from scratch.
+    incremental = False
+    # The tables of every board shape and goal we've seen, keyed by (rows, cols, goal tiles).
+    tables = {}
+
+    def __init__(self, board):
+        super().__init__(board)
+        key = (board.rows, board.cols, tuple(board.goal_tiles))
+        if key not in self.tables:
+            self.tables[key] = self.build_tables()
+        self.costs, self.row_parts, self.col_parts, self.row_conflicts, self.col_conflicts = self.tables[key]
+
+    # Builds our per-tile tables and the conflicts of every arrangement of a row and of a column.
+    # A line is keyed by one digit per cell, in base length + 1: 0 for a blank or a tile whose goal is on another
+    # line, and 1 + the tile's goal cell within the line otherwise. Keys are sums of per-tile parts, so a board's
+    # keys take a single pass over its tiles.
+    def build_tables(self):
+        board = self.board
+        rows, cols, size = board.rows, board.cols, board.size
+        costs, row_parts, col_parts = [0] * (size * size), [0] * (size * size), [0] * (size * size)
+        for tile in range(1, size):
+            goal_i, goal_j = board.goal_pos[tile]
+            for pos in range(size):
+                i, j = divmod(pos, cols)
+                costs[tile * size + pos] = self.tile_cost(tile, pos)
+                if i == goal_i:
+                    row_parts[tile * size + pos] = (goal_j + 1) * (cols + 1) ** (cols - 1 - j)
+                if j == goal_j:
+                    col_parts[tile * size + pos] = (goal_i + 1) * (rows + 1) ** (rows - 1 - i)
+        return costs, row_parts, col_parts, self.build_conflicts(cols), self.build_conflicts(rows)
+
+    # The extra moves (2 per tile that must leave the line) of every arrangement of a line w/ length cells.
+    def build_conflicts(self, length):
+        conflicts = {}
+        for digits in self.arrangements(length, length, set()):
+            goals = [digit for digit in digits if digit]
+            # The longest increasing run of goal cells, by dynamic programming (lines are short).
+            longest = [1] * len(goals)
+            for i in range(len(goals)):
+                for k in range(i):
+                    if goals[k] < goals[i] and longest[k] + 1 > longest[i]:
+                        longest[i] = longest[k] + 1
+            key = 0
+            for digit in digits:
+                key = key * (length + 1) + digit
+            conflicts[key] = 2 * (len(goals) - max(longest, default=0))
+        return conflicts
+
+    # Every way to fill cells cells of a line w/ digits (0 any number of times, 1 .. length at most once each).
+    def arrangements(self, length, cells, used):
+        if cells == 0:
+            yield []
+            return
+        for digit in range(length + 1):
+            if digit and digit in used:
+                continue
+            for rest in self.arrangements(length, cells - 1, used | {digit} if digit else used):
+                yield [digit] + rest
+
+    def evaluate_tiles(self, tiles):
+        board = self.board
+        size, cols = board.size, board.cols
+        costs, row_parts, col_parts = self.costs, self.row_parts, self.col_parts
+        row_keys, col_keys = [0] * board.rows, [0] * cols
+        h_val = 0
+        for pos, tile in enumerate(tiles):
+            if tile != 0:
+                index = tile * size + pos
+                h_val += costs[index]
+                row_keys[pos // cols] += row_parts[index]
+                col_keys[pos % cols] += col_parts[index]
+        row_conflicts, col_conflicts = self.row_conflicts, self.col_conflicts
+        for key in row_keys:
+            h_val += row_conflicts[key]
+        for key in col_keys:
+            h_val += col_conflicts[key]
+        return h_val
+
+
+# The walking distance heuristic. Looking only at which row each tile is in (and which row it belongs in),
+# the fewest moves of the blank up and down that bring every tile to its goal row is a lower bound on the vertical
+# moves needed, and likewise for columns and horizontal moves, so their sum is admissible (and at least the
+# Manhattan distance). We find these walks for every arrangement by a BFS back from the goal, once per shape and goal.
+class WalkingDistanceHeuristic(Heuristic):
+    name = 'wd'
+    # A walk depends on the whole board, so we always evaluate from scratch.
+    incremental = False
+    # The tables of every board shape and goal we've seen, keyed by (rows, cols, goal tiles).
+    tables = {}
+
+    def __init__(self, board):
+        super().__init__(board)
+        key = (board.rows, board.cols, tuple(board.goal_tiles))
+        if key not in self.tables:
+            self.tables[key] = self.build_tables()
+        self.row_parts, self.col_parts, self.row_walks, self.col_walks = self.tables[key]
+
+    # Builds our per-tile tables and the walking distance of every arrangement of rows and of columns.
+    # An arrangement of lines is keyed by count[line][goal line], the number of tiles in each line that belong in
+    # each line, w/ bits bits per count, and the blank's line above those. Keys are sums of per-tile parts
+    # (the blank's part holds its line), so a board's keys take a single pass over its tiles.
+    def build_tables(self):
+        board = self.board
+        rows, cols, size = board.rows, board.cols, board.size
+        row_bits, col_bits = cols.bit_length(), rows.bit_length()
+        row_parts, col_parts = [0] * (size * size), [0] * (size * size)
+        for tile in range(size):
+            goal_i, goal_j = board.goal_pos[tile]
+            for pos in range(size):
+                i, j = divmod(pos, cols)
+                if tile == 0:
+                    row_parts[pos] = i << (row_bits * rows * rows)
+                    col_parts[pos] = j << (col_bits * cols * cols)
+                else:
+                    row_parts[tile * size + pos] = 1 << (row_bits * (i * rows + goal_i))
+                    col_parts[tile * size + pos] = 1 << (col_bits * (j * cols + goal_j))
+        blank_i, blank_j = board.goal_pos[0]
+        return row_parts, col_parts, self.build_walks(rows, cols, blank_i), self.build_walks(cols, rows, blank_j)
+
+    # The walking distance of every arrangement of lines lines of width cells, by BFS from the goal arrangement.
+    def build_walks(self, lines, width, blank_goal):
+        bits = width.bit_length()
+        mask = (1 << bits) - 1
+        blank_shift = bits * lines * lines
+        goal = blank_goal << blank_shift
+        for line in range(lines):
+            goal |= (width - (line == blank_goal)) << (bits * (line * lines + line))
+        walks = {goal: 0}
+        layer = [goal]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for key in layer:
+                blank = key >> blank_shift
+                for line in (blank - 1, blank + 1):
+                    if not 0 <= line < lines:
+                        continue
+                    # Any tile in the neighboring line can swap places w/ the blank, whichever line it belongs in.
+                    for goal_line in range(lines):
+                        shift = bits * (line * lines + goal_line)
+                        if (key >> shift) & mask:
+                            new_key = key - (1 << shift) + (1 << (bits * (blank * lines + goal_line)))
+                            new_key += (line - blank) << blank_shift
+                            if new_key not in walks:
+                                walks[new_key] = depth
+                                next_layer.append(new_key)
+            layer = next_layer
+        return walks
+
+    def evaluate_tiles(self, tiles):
+        size = self.board.size
+        row_parts, col_parts = self.row_parts, self.col_parts
+        row_key = col_key = 0
+        for pos, tile in enumerate(tiles):
+            row_key += row_parts[tile * size + pos]
+            col_key += col_parts[tile * size + pos]
+        return self.row_walks[row_key] + self.col_walks[col_key]
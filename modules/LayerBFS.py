@@ -0,0 +1,168 @@
+# A layer-synchronous breadth-first search, for enumerating whole state spaces (e.g. to build a distance table,
+# or to exhaust the half of the 8 puzzle an unsolvable board lives in) on every core.
+# Each layer is a sorted uint64 array of packed boards. We split it into chunks, and every worker expands its chunks
+# w/ NumPy (see Vectorized.py), dropping duplicates and boards that were already visited, so the main process only
+# merges the workers' arrays and marks the new boards.
+# Visited boards are a bitmap indexed by Board.rank, kept in shared memory: workers read it while we expand a layer,
+# and only the main process writes it, between layers. Boards too large to rank into a bitmap (the 15 puzzle)
+# are deduplicated against the layer before instead: every move moves the blank to a cell of the other color of a
+# checkerboard, so a child is either new or one move closer to the root.
+#
+# Usage: LayerBFS(board).distances(board.goal), or for depth, layer in LayerBFS(board, workers=4).layers([code]): ...
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+# Importing our classes.
+from modules.Board import Board
+from modules.ClosedSet import ClosedSet
+from modules.Vectorized import VectorHeuristic
+
+# The state of every worker (and of the main process, when it expands chunks itself): our vectorized board and
+# a view of the shared visited bitmap (None when we don't keep one).
+worker = {}
+
+# Sets up a worker for a board, attaching to the shared visited bitmap by name.
+def start_worker(goal_state, rows, cols, bitmap_name, bitmap_size):
+    vector = VectorHeuristic(Board(goal_state, rows, cols))
+    worker['vector'] = vector
+    worker['memory'] = None
+    worker['visited'] = None
+    if bitmap_name is not None:
+        worker['memory'] = shared_memory.SharedMemory(name=bitmap_name)
+        worker['visited'] = np.ndarray((bitmap_size,), np.uint8, worker['memory'].buf)
+
+# Expands a chunk of a layer, returning its new children (sorted and unique) and their ranks (None w/o a bitmap).
+def expand_chunk(codes):
+    vector, visited = worker['vector'], worker['visited']
+    children = np.unique(vector.expand(codes)[1])
+    if visited is None:
+        return children, None
+    ranks = vector.rank(vector.unpack(children))
+    fresh = (visited[ranks >> 3] >> (ranks & 7).astype(np.uint8)) & 1 == 0
+    return children[fresh], ranks[fresh]
+
+
+class LayerBFS:
+    def __init__(self, board, workers=None, chunksize=16384):
+        # The board layout (dimensions and goal) of the boards we search.
+        self.board = board
+        VectorHeuristic(board).check_packable()
+        # The number of worker processes (1 expands every layer in this process), and the boards per task.
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        # Whether we keep a visited bitmap (see ClosedSet.max_ranked for the boards small enough).
+        self.ranked = board.reachable <= ClosedSet.max_ranked
+        # The number of boards we've expanded, the number we've visited (every layer's boards, roots included),
+        # and the most boards a layer held.
+        self.expanded = 0
+        self.visited = 0
+        self.max_layer = 0
+        # The layers of our latest path search, kept so a stopped search can still trace a way to its last layer.
+        self.reached = []
+
+    # Yields (depth, layer) for every layer reachable from the root boards (packed, all on the same side of the
+    # parity split), starting w/ the roots at depth 0, up to max_depth (or until nothing new is reachable).
+    def layers(self, roots, max_depth=None):
+        board = self.board
+        layer = np.unique(np.asarray(roots, np.uint64))
+        memory = None
+        bitmap_name, bitmap_size = None, (board.reachable + 7) // 8
+        if self.ranked:
+            memory = shared_memory.SharedMemory(create=True, size=bitmap_size)
+            bitmap_name = memory.name
+        setup = (board.decode(board.goal), board.rows, board.cols, bitmap_name, bitmap_size)
+        executor = None
+        try:
+            start_worker(*setup)
+            visited = worker['visited']
+            if visited is not None:
+                visited[:] = 0
+                self.mark(visited, worker['vector'].rank(worker['vector'].unpack(layer)))
+            if self.workers > 1:
+                executor = ProcessPoolExecutor(max_workers=self.workers, initializer=start_worker, initargs=setup)
+            previous = np.empty(0, np.uint64)
+            depth = 0
+            while len(layer):
+                self.max_layer = max(self.max_layer, len(layer))
+                self.visited += len(layer)
+                yield depth, layer
+                if max_depth is not None and depth >= max_depth:
+                    break
+                self.expanded += len(layer)
+                chunks = np.array_split(layer, -(-len(layer) // self.chunksize))
+                # Small layers aren't worth shipping to the pool.
+                if executor is None or len(chunks) == 1:
+                    results = [expand_chunk(chunk) for chunk in chunks]
+                else:
+                    results = list(executor.map(expand_chunk, chunks))
+                children = np.concatenate([result[0] for result in results])
+                if visited is not None:
+                    # Chunks can share children, so we keep the first copy of each rank.
+                    ranks, first = np.unique(np.concatenate([result[1] for result in results]), return_index=True)
+                    self.mark(visited, ranks)
+                    next_layer = np.sort(children[first])
+                else:
+                    next_layer = np.setdiff1d(np.unique(children), previous, assume_unique=True)
+                previous, layer = layer, next_layer
+                depth += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            worker.clear()
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+
+    # Sets the bits of ranks in a visited bitmap.
+    @staticmethod
+    def mark(visited, ranks):
+        np.bitwise_or.at(visited, ranks >> 3, np.left_shift(1, ranks & 7).astype(np.uint8))
+
+    # The number of boards at each depth from the root.
+    def layer_sizes(self, root):
+        return [len(layer) for depth, layer in self.layers([root])]
+
+    # The depth of every board reachable from the root, indexed by Board.rank (unreached boards hold unknown).
+    def distances(self, root, unknown=0xFF):
+        if not self.ranked:
+            raise ValueError(f"A distance table of a {self.board.rows}x{self.board.cols} board would need {self.board.reachable} entries.")
+        table = np.full(self.board.reachable, unknown, np.uint8)
+        vector = VectorHeuristic(self.board)
+        for depth, layer in self.layers([root]):
+            table[vector.rank(vector.unpack(layer))] = depth
+        return bytearray(table)
+
+    # Searches from the start board until a layer holds the goal, keeping every layer so we can walk back.
+    # The optional stop callback is called after every layer, and ends the search when it returns something truthy.
+    # Returns the cells the blank moves through, or None if the goal can't be reached (or we were stopped).
+    def path(self, start, goal, stop=None):
+        layers = self.reached = []
+        for depth, layer in self.layers([start]):
+            layers.append(layer)
+            index = np.searchsorted(layer, np.uint64(goal))
+            if index < len(layer) and layer[index] == goal:
+                break
+            if stop is not None and stop():
+                return None
+        else:
+            return None
+        return self.trace(layers, goal)
+
+    # Walks back from a board in the last of the layers of a path search to its root.
+    # Returns the cells the blank moves through from the root to the board.
+    def trace(self, layers, code):
+        board = self.board
+        # Layers are sorted, so finding the parent of a board in the layer before is a binary search.
+        empty_pos = board.find_blank(code)
+        path = []
+        for layer in reversed(layers[:-1]):
+            path.append(empty_pos)
+            for pos in board.neighbors[empty_pos]:
+                parent = board.slide(code, empty_pos, pos)
+                index = np.searchsorted(layer, np.uint64(parent))
+                if index < len(layer) and layer[index] == parent:
+                    break
+            code, empty_pos = parent, pos
+        path.reverse()
+        return path
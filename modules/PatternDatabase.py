@@ -0,0 +1,154 @@
+# An additive, disjoint pattern database (PDB) heuristic.
+# The tiles are split into disjoint groups (patterns). For each pattern we store, for every placement of its tiles,
+# the fewest moves *of those tiles* needed to bring them home, found by a breadth-first search backwards from the goal.
+# As each move only counts towards one pattern, the lookups can be added together and the sum stays admissible.
+#
+# Tables are stored one byte per entry in a binary file and memory-mapped on load, so many solver processes
+# share one copy in the page cache and loading an existing database is near instant.
+import hashlib
+import os
+import struct
+from collections import deque
+# Importing our Heuristic base class.
+from modules.Heuristic import Heuristic
+# Importing the file format our tables share.
+from modules.TableFile import TableFile
+
+class PatternDatabase(Heuristic, TableFile):
+    name = 'pdb'
+    # A lookup needs the positions of several tiles, so there is no per-tile delta table.
+    incremental = False
+    # The first bytes of every database file (older versions' tables were built differently, so they don't load).
+    magic = b'PDB2'
+    # The databases this process has already opened, so repeated solves (e.g. in a batch worker) share them.
+    opened = {}
+
+    def __init__(self, board, patterns=None, path=None, mirror=False):
+        super().__init__(board)
+        # The disjoint groups of tiles we build a table for.
+        self.patterns = [tuple(pattern) for pattern in (patterns or self.default_patterns(board))]
+        covered = sorted(tile for pattern in self.patterns for tile in pattern)
+        if covered != list(range(1, board.size)):
+            raise ValueError("The patterns must cover every tile exactly once.")
+        # Where our tables live on disk.
+        self.path = path or os.path.join(self.default_directory, self.default_filename())
+        # Load the tables, building (and saving) them first if they don't exist yet.
+        if not self.load():
+            self.save(*self.build())
+            if not self.load():
+                raise ValueError(f"Could not load the pattern database at {self.path}.")
+        # On symmetric boards (see Board.symmetric) a board and its mirror are equally far from the goal, so the same
+        # tables also bound the mirror, and the larger of the two sums is still admissible. The mirror's tiles in a
+        # pattern are the relabeled pattern's tiles, sitting in transposed cells.
+        self.mirror = mirror and board.symmetric
+        if self.mirror:
+            self.mirrored_patterns = [tuple(board.relabel[tile] for tile in pattern) for pattern in self.patterns]
+
+    # Opens the database for a board's goal and patterns, reusing it if this process already has it open.
+    @classmethod
+    def open(cls, board, patterns=None, path=None, mirror=False):
+        patterns = [tuple(pattern) for pattern in (patterns or cls.default_patterns(board))]
+        key = (board.rows, board.cols, tuple(board.goal_tiles), tuple(patterns), path, mirror)
+        return cls.reuse(key, lambda: cls(board, patterns, path, mirror))
+
+    # Splits the tiles (in goal order) into groups of at most 5, e.g. 4-4 for the 8 puzzle and 5-5-5 for the 15 puzzle.
+    @staticmethod
+    def default_patterns(board):
+        tiles = [tile for tile in board.goal_tiles if tile != 0]
+        groups = -(-len(tiles) // 5)
+        group_size = -(-len(tiles) // groups)
+        return [tuple(tiles[i:i + group_size]) for i in range(0, len(tiles), group_size)]
+
+    # A file name unique to the board shape, goal layout and patterns.
+    def default_filename(self):
+        key = repr((self.board.rows, self.board.cols, self.board.goal_tiles, self.patterns)).encode()
+        return f"pdb_{self.board.rows}x{self.board.cols}_{hashlib.sha1(key).hexdigest()[:12]}.bin"
+
+    # The number of ways to place k tiles on n cells, i.e. the number of entries in a pattern's table.
+    @staticmethod
+    def table_size(n, k):
+        count = 1
+        for i in range(k):
+            count *= n - i
+        return count
+
+    # Ranks the cells of a pattern's tiles (all distinct) into 0 .. table_size - 1.
+    def rank(self, positions):
+        n = self.board.size
+        index = 0
+        for i, pos in enumerate(positions):
+            # The digit is the cell's position among the cells not taken by earlier tiles.
+            digit = pos
+            for prev in positions[:i]:
+                if prev < pos:
+                    digit -= 1
+            index = index * (n - i) + digit
+        return index
+
+    # Builds the table of one pattern with a breadth-first search backwards from the goal.
+    # Our abstract state is the cells of the pattern's tiles alone: any of them may slide into a neighboring cell that
+    # no other pattern tile holds, at a cost of 1. A real move moves one tile by one cell, so it changes at most one
+    # lookup by at most 1, which keeps the sum consistent (and A*, which never reopens a closed board, optimal).
+    def build_table(self, pattern):
+        board = self.board
+        table = bytearray(b'\xff') * self.table_size(board.size, len(pattern))
+        goal_index = {tile: pos for pos, tile in enumerate(board.goal_tiles)}
+        positions = tuple(goal_index[tile] for tile in pattern)
+        table[self.rank(positions)] = 0
+        queue = deque([(0, positions)])
+        while queue:
+            cost, positions = queue.popleft()
+            cost += 1
+            for i, cell in enumerate(positions):
+                for pos in board.neighbors[cell]:
+                    if pos in positions:
+                        continue
+                    new_positions = positions[:i] + (pos,) + positions[i + 1:]
+                    rank = self.rank(new_positions)
+                    if table[rank] == 0xFF:
+                        table[rank] = cost
+                        queue.append((cost, new_positions))
+        return table
+
+    # Builds the tables of every pattern.
+    def build(self):
+        return [self.build_table(pattern) for pattern in self.patterns]
+
+    # The header of our database file: the board shape, the goal layout and the patterns.
+    def header(self):
+        data = self.magic + struct.pack('<BBB', self.board.rows, self.board.cols, len(self.patterns))
+        data += bytes(self.board.goal_tiles)
+        for pattern in self.patterns:
+            data += struct.pack('<B', len(pattern)) + bytes(pattern)
+        return data
+
+    # Memory-maps our tables from disk. Returns False if there is no usable database at our path.
+    def load(self):
+        entries = self.map_entries()
+        if entries is None:
+            return False
+        # A read-only view of each pattern's table inside the mapped file.
+        self.tables = []
+        offset = 0
+        for pattern in self.patterns:
+            size = self.table_size(self.board.size, len(pattern))
+            self.tables.append(entries[offset:offset + size])
+            offset += size
+        return offset == len(entries)
+
+    # Sums the table lookups of every pattern.
+    def evaluate_tiles(self, tiles):
+        cells = [0] * len(tiles)
+        for pos, tile in enumerate(tiles):
+            cells[tile] = pos
+        h_val = 0
+        for pattern, table in zip(self.patterns, self.tables):
+            h_val += table[self.rank([cells[tile] for tile in pattern])]
+        if self.mirror:
+            transposed = self.board.transposed_cells
+            mirror_h = 0
+            for pattern, table in zip(self.mirrored_patterns, self.tables):
+                mirror_h += table[self.rank([transposed[cells[tile]] for tile in pattern])]
+            if mirror_h > h_val:
+                h_val = mirror_h
+        return h_val
@@ -1,7 +1,21 @@
-# Importing heapq to use as our min heap.
-import heapq
 # Importing our State class from State.py.
 from modules.State import State
+# Importing our Board class, which packs boards into integers.
+from modules.Board import Board
+# Importing our heuristics and search strategies.
+from modules.Heuristic import NoHeuristic, ManhattanHeuristic, MisplacedHeuristic, EuclideanHeuristic, LinearConflictHeuristic, WalkingDistanceHeuristic
+from modules.Strategy import Strategy
+from modules.Frontier import Frontier
+from modules.ClosedSet import ClosedSet, RankedClosedSet
+from modules.SearchStats import SearchStats, TimedFrontier, TimedEvaluate
+from modules.Result import SearchResult
+from modules.PatternDatabase import PatternDatabase
+from modules.DistanceTable import DistanceTable
+try:
+    from modules.LayerBFS import LayerBFS
+except ImportError:
+    # NumPy is optional; without it we can't run layered searches.
+    LayerBFS = None
 
 class Problem:
     # Our state id: a static variable used to keep track of the number of states we've considered.
@@ -14,9 +28,9 @@ class Problem:
 
     # Our constructor which initializes our problem.
     def __init__(self, initial_state, goal_state):
-        # The dimensions of the 8 puzzle.
-        self.rows = 3
-        self.cols = 3
+        # The dimensions of the puzzle, taken from our goal state (3x3 for the 8 puzzle).
+        self.rows = len(goal_state)
+        self.cols = len(goal_state[0])
         # Our initial state.
         self.initial_state = initial_state
         # Our current state.
@@ -25,24 +39,56 @@ class Problem:
         self.goal_state = goal_state
         # The number of moves we've made.
         self.moves = 0
+        # Our board layout, used to pack every board we search into a single integer.
+        self.board = Board(goal_state, self.rows, self.cols)
+        self.board.check_tiles(initial_state.state, "initial state")
         # The correct position of each tile.
-        self.tile_map = {
-            1: (0,0),
-            2: (0,1),
-            3: (0,2),
-            4: (1,0),
-            5: (1,1),
-            6: (1,2),
-            7: (2,0),
-            8: (2,1),
-        }
-        # A set of the states we've seen.
-        self.was_seen = set()
+        self.tile_map = {tile: self.board.goal_pos[tile] for tile in range(1, self.board.size)}
+        # The packed form of our current state.
+        self.current_code = self.board.encode(initial_state.state)
+        # The (packed) states we've seen, each mapped to the 2-bit code of the move that reached it (-1 for the root).
+        # This doubles as our parent map: following the moves backwards from the goal rebuilds the solution.
+        self.was_seen = {}
+        # The moves of the blank that solve the puzzle, e.g. ['U', 'L', 'D'].
+        self.solution = []
+        # Debug mode: cross-check every incremental h(n) against a full recompute.
+        self.check_heuristic = False
+        # The statistics of our latest search (see SearchStats.py).
+        self.stats = SearchStats()
+        # Instrumentation: time the frontier and the heuristic, and count duplicates. Off by default, as it slows the search.
+        self.instrument = False
+        # An optional callback, called w/ our (partially filled) SearchStats every progress_every expansions.
+        self.progress = None
+        self.progress_every = 10000
+        # An optional reporter, told when a search starts and what it found (e.g. a ConsoleReporter). We never print.
+        self.reporter = None
+        # An optional SolutionCache, checked before searching and filled after (see SolutionCache.py).
+        self.cache = None
+        # An optional Budget (see Budget.py). A search that runs out of it stops early, remembering why and the
+        # closest board to the goal (by h(n)) it had reached, as a dict w/ the board, h, moves and solution.
+        # Searches w/o a heuristic (UCS, bidirectional and layered search) score their boards w/ the Manhattan distance.
+        self.budget = None
+        self.stop_reason = None
+        self.partial = None
+        # The expansion count of our next progress report.
+        self.next_report = 0
+        # An optional callback, called w/ every improved solution of our anytime search (see anytime_solutions).
+        self.on_solution = None
+        # How much longer than optimal our solution may be, for searches that know (None otherwise).
+        self.bound = None
 
     # Get the current state.
     def get_state(self):
         return self.current_state
     
+    # Get the moves of the blank that solve the puzzle.
+    def get_solution(self):
+        return self.solution
+
+    # Get the statistics of our latest search.
+    def get_stats(self):
+        return self.stats
+
     # Get the number of moves made.
     def get_moves(self):
         return self.moves
@@ -69,533 +115,863 @@ class Problem:
     
     # Get the position of the empty tile.
     def get_empty_tile_pos(self):
-        for i in range(self.rows):
-            for j in range(self.cols):
-                if self.current_state.state[i][j] == 0:
-                    return i, j
-                
+        return divmod(self.board.find_blank(self.current_code), self.cols)
+
     # Find the positions that can be moved into the empty tile.
     def get_possible_moves(self):
-        empty_tile_pos = self.get_empty_tile_pos()
-        possible_moves = []
-        all_directions = [(0,1), (0,-1), (1,0), (-1,0)]
-
-        for direction_offset in all_directions:
-            x_offset, y_offset = direction_offset
-            new_x = empty_tile_pos[0] + x_offset
-            new_y = empty_tile_pos[1] + y_offset
-            if new_x >= 0 and new_x < self.rows and new_y >= 0 and new_y < self.cols:
-                possible_moves.append((new_x, new_y))
-        return possible_moves
+        empty_pos = self.board.find_blank(self.current_code)
+        return [divmod(pos, self.cols) for pos in self.board.neighbors[empty_pos]]
     
-    # Making a move into the empty tile using Uniform Cost Search (Only the cost is considered, not the heuristic).
-    def make_move_using_ucs(self):
-        popped_state = None
+    # Compares an incrementally updated heuristic value against a full recompute (debug mode only).
+    def verify_heuristic(self, heuristic, code, hn):
+        full_hn = heuristic(code)
+        if abs(full_hn - hn) > 1e-9:
+            raise RuntimeError(f"Incremental h(n)={hn} does not match the recomputed h(n)={full_hn}.")
+
+    # Our search core: a best-first search shared by every algorithm.
+    # The heuristic scores each state and the strategy turns g(n) and h(n) into its priority.
+    # Returns the depth of the goal node, or -1 if the goal can't be reached.
+    def search(self, heuristic, strategy, frontier='auto', closed='dict'):
+        # Resetting the state id.
+        self.id = 0
+        # Our frontier: a binary heap or integer buckets (see Frontier.py). Buckets need integer priorities.
+        integral = heuristic.integral and all(isinstance(weight, int) for weight in (strategy.g_weight, strategy.h_weight))
+        self.frontier = Frontier.create(frontier, integral)
+        stats = self.stats = SearchStats(f"{strategy.name}/{heuristic.name}")
+        evaluate = heuristic.evaluate
+        # Instrumented runs swap in timed wrappers, so the loop below is the same code either way.
+        if self.instrument:
+            self.frontier = TimedFrontier(self.frontier, stats)
+            evaluate = TimedEvaluate(evaluate, stats)
+        # Our closed set, which is also our parent map: a dict, or a bit array indexed by rank (see ClosedSet.py).
+        self.was_seen = ClosedSet.create(closed, self.board)
+        # Ranking a board is costly, so w/ a ranked closed set we rank each board once, when it's generated.
+        ranked = isinstance(self.was_seen, RankedClosedSet)
+        # Every frontier entry is of the form (board, moves, blank, h, move, rank), where board is the packed state,
+        # move is the code of the move that produced it, and rank is its rank (or None w/o a ranked closed set).
+        initial_code = self.board.encode(self.initial_state.state)
+        # The root is the only state whose heuristic is computed from scratch.
+        initial_hn = evaluate(initial_code)
+        initial_rank = self.board.rank(initial_code) if ranked else None
+        self.frontier.push(strategy.priority(0, initial_hn), 0, (initial_code, 0, self.board.find_blank(initial_code), initial_hn, -1, initial_rank))
+        # Our open set index: the best g(n) each board waiting in the frontier was pushed with. A child that's
+        # already waiting at no higher cost is skipped before we even score it, which keeps duplicates out of the frontier.
+        open_g = {initial_code: 0}
+
+        # Local names for everything we touch per node, as this loop is our hot path.
+        frontier, was_seen = self.frontier, self.was_seen
+        pop, push = frontier.pop, frontier.push
+        size, shifts, mask = self.board.size, self.board.shifts, self.board.mask
+        neighbor_moves, goal = self.board.neighbor_moves, self.board.goal
+        deltas, incremental = heuristic.deltas, heuristic.incremental
+        g_weight, h_weight = strategy.g_weight, strategy.h_weight
+        check_heuristic = self.check_heuristic
+        rank, has_rank, close_rank = (self.board.rank, was_seen.has_rank, was_seen.close_rank) if ranked else (None, None, None)
+        # Ranks take the blank's cell times the number of ranks per cell (see Board.rank).
+        blank_weight = self.board.factorials[size - 1] // 2
+        new_rank = None
+        state_id = self.id
+        nodes_expanded = 0
+        max_nodes = max(self.max_nodes, frontier.size)
+        # When we next report our progress or check our budget (never, if we have neither).
+        next_check = self.start_checks()
+        found = False
+
         # As long as we have states to consider...
-        while len(self.frontier) > 0:
-            # We pop the state w/ the min cost. Recall that our quadruples are of the form (cost, id, state, moves).
-            popped_state_quadruple = heapq.heappop(self.frontier)
-            popped_state = popped_state_quadruple[2]
-            # If we haven't seen this state before, we can process it.
-            if str(popped_state.state) not in self.was_seen:
-                # Mark the state as seen as we'll be processing it now.
-                self.was_seen.add(str(popped_state.state))
-                break # Breaking out once we have a state to process.
-            # Otherwise, we need to keep popping states until we find one we haven't seen before.
+        while frontier.size:
+            if nodes_expanded == next_check:
+                next_check = self.checkpoint(nodes_expanded, state_id, len(was_seen), max_nodes)
+                if self.stop_reason:
+                    break
+            # We pop the state w/ the min cost.
+            code, num_moves, empty_pos, hn, move, code_rank = pop()
+            # States can sit in the frontier more than once, so we skip the ones we've already processed.
+            # The first time a state is popped is along its best path, so that's the move we remember.
+            if ranked:
+                if has_rank(code_rank):
+                    continue
+                close_rank(code_rank, code, move)
             else:
-                popped_state = None
-        # If no new states were found, we have reached a dead end.
-        if popped_state == None:
-            print("There are no more possible moves.")
-            self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # If we've reached our goal state, we save some info and return.
-        if popped_state.state == self.goal_state:
-            self.current_state = popped_state
-            self.moves = popped_state_quadruple[3]
-            gn = popped_state.get_cost(popped_state_quadruple[3])
-            print(f"The final state w/ g(n)={gn} is...")
-            popped_state.print_state()
-            return
-        
-        # The diameter of the puzzle is 31, so we can't have more than 31 moves.
-        if popped_state_quadruple[3] > 31:
-            print("The puzzle is unsolvable.")
-            self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # Some helpful text to let us know we're making progress.
-        gn = popped_state.get_cost(popped_state_quadruple[3])
-        #print(f"The best state to expand w/ g(n)={gn} is...")
-        #popped_state.print_state()
-        #print()
-        # Increment the number of nodes we've expanded.
-        self.nodes_expanded += 1
-        # Now, we can begin to process the popped state.
-        self.current_state = popped_state
-        # Storing the number of moves we've made to reach our current state.
-        num_moves = popped_state_quadruple[3]
-        self.moves = num_moves
-        # Get all the possible moves we can make from the current state.
-        possible_moves = self.get_possible_moves()
-        # Get the position of the empty tile.
-        empty_tile_pos = self.get_empty_tile_pos()
-        empty_i, empty_j = empty_tile_pos
-        # A list to store the new states we can reach from the current state.
-        new_states = []
-
-        # Let's consider all the moves we can make.
-        for move in possible_moves:
-            i,j = move
-            # Storing the number of moves we've made to reach our current state.
-            num_moves = popped_state_quadruple[3]
-            # We need a copy of the current state.
-            current_state_copy = [row[:] for row in self.current_state.state]
-            new_state = State(current_state_copy)
-            # Swap the empty tile with the tile we want to move.
-            new_state.state[empty_i][empty_j], new_state.state[i][j] = new_state.state[i][j], new_state.state[empty_i][empty_j]
-            # For Uniform Cost Search, we only consider the cost of the state (i.e. the moves to reach the current state).
-            num_moves += 1
-            new_state_cost = num_moves
-            # As we've produced a new state, we need to increment our state id.
-            self.id += 1
-            # We can then add the new state to our list of new states.
-            new_states.append((new_state_cost, self.id, new_state, num_moves))
-        
-        # Next, we need to add the states we haven't seen to our frontier.
-        # Recall that our quadruples are of the form (cost, id, state, moves).
-        for state_quadruple in new_states:
-            # We store our state (a State object).
-            state = state_quadruple[2] 
-            # If we haven't seen this state before, we can add it to our frontier.
-            if str(state.state) not in self.was_seen:
-                # We add the state triplet to our frontier.
-                heapq.heappush(self.frontier, state_quadruple)
-                self.max_nodes = max(self.max_nodes, len(self.frontier))
-    
-    # Making a move into the empty tile using the MD heuristic.
-    def make_move_using_md(self):
-        popped_state = None
-        # As long as we have states to consider...
-        while len(self.frontier) > 0:
-            # We pop the state w/ the min cost. Recall that our quadruples are of the form (cost, id, state, moves).
-            popped_state_quadruple = heapq.heappop(self.frontier)
-            popped_state = popped_state_quadruple[2]
-            # If we haven't seen this state before, we can process it.
-            if str(popped_state.state) not in self.was_seen:
-                # Mark the state as seen as we'll be processing it now.
-                self.was_seen.add(str(popped_state.state))
+                if code in was_seen:
+                    continue
+                was_seen[code] = move
+            del open_g[code]
+
+            # If we've reached our goal state, we save some info and return.
+            if code == goal:
+                self.current_code = code
+                self.current_state = State(self.board.decode(code), self.rows, self.cols)
+                self.moves = num_moves
+                self.solution = self.trace_solution(code, empty_pos)
+                found = True
                 break
-            # Otherwise, we need to keep popping states until we find one we haven't seen before.
-            else:
-                popped_state = None
-        # If no new states were found, we have reached a dead end.
-        if popped_state == None:
-            print("There are no more possible moves.")
-            self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # If we've reached our goal state, we save some info and return.
-        if popped_state.state == self.goal_state:
-            self.current_state = popped_state
-            self.moves = popped_state_quadruple[3]
-            gn = popped_state.get_cost(popped_state_quadruple[3])
-            hn = popped_state.get_heuristic_md(self.goal_state, self.tile_map)
-            print(f"The final state w/ g(n)={gn} and h(n)={hn} is...")
-            popped_state.print_state()
-            return
-        
-        # The diameter of the puzzle is 31, so we can't have more than 31 moves.
-        if popped_state_quadruple[3] > 31:
-            print("The puzzle is unsolvable.")
-            self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # Some helpful text to let us know we're making progress.
-        gn = popped_state.get_cost(popped_state_quadruple[3])
-        hn = popped_state.get_heuristic_md(self.goal_state, self.tile_map)
-        #print(f"The best state to expand w/ g(n)={gn} and h(n)={hn} is...")
-        #popped_state.print_state()
-        #print()
-        # Increment the number of nodes we've expanded.
-        self.nodes_expanded += 1
-        # Now, we can begin to process the popped state.
-        self.current_state = popped_state
-        # Storing the number of moves we've made to reach our current state.
-        num_moves = popped_state_quadruple[3]
-        self.moves = num_moves
-        #print('Moves so far: ', self.moves)
-        # Get all the possible moves we can make from the current state.
-        possible_moves = self.get_possible_moves()
-        # Get the position of the empty tile.
-        empty_tile_pos = self.get_empty_tile_pos()
-        empty_i, empty_j = empty_tile_pos
-        # A list to store the new states we can reach from the current state.
-        new_states = []
-
-        # Let's consider all the moves we can make.
-        for move in possible_moves:
-            i,j = move
-            # Storing the number of moves we've made to reach our current state.
-            num_moves = popped_state_quadruple[3]
-            # We need a copy of the current state.
-            current_state_copy = [row[:] for row in self.current_state.state]
-            new_state = State(current_state_copy)
-            # Swap the empty tile with the tile we want to move.
-            new_state.state[empty_i][empty_j], new_state.state[i][j] = new_state.state[i][j], new_state.state[empty_i][empty_j]
-            # For A* search w/ the MD heuristic, we consider the total cost of the state.
+
+            # Increment the number of nodes we've expanded.
+            nodes_expanded += 1
+            # Every child is one move deeper than the popped state.
             num_moves += 1
-            new_state_cost = new_state.get_total_cost_md(num_moves, self.goal_state, self.tile_map)
-            # As we've produced a new state, we need to increment our state id.
-            self.id += 1
-            # We can then add the new state to our list of new states.
-            new_states.append((new_state_cost, self.id, new_state, num_moves))
-        
-        # Next, we need to add the states we haven't seen to our frontier.
-        # Recall that our quadruples are of the form (cost, id, state, moves).
-        for state_quadruple in new_states:
-            # We store our state (a State object).
-            state = state_quadruple[2] 
-            # If we haven't seen this state before, we can add it to our frontier.
-            if str(state.state) not in self.was_seen:
-                # We add the state triplet to our frontier.
-                heapq.heappush(self.frontier, state_quadruple)
-                self.max_nodes = max(self.max_nodes, len(self.frontier))
-
-    # Making a move into the empty tile using the Misplaced Tiles heuristic.
-    def make_move_using_mt(self):
-        popped_state = None
-        # As long as we have states to consider...
-        while len(self.frontier) > 0:
-            # We pop the state w/ the min cost. Recall that our quadruples are of the form (cost, id, state, moves).
-            popped_state_quadruple = heapq.heappop(self.frontier)
-            popped_state = popped_state_quadruple[2]
-            # If we haven't seen this state before, we can process it.
-            if str(popped_state.state) not in self.was_seen:
-                # Mark the state as seen as we'll be processing it now.
-                self.was_seen.add(str(popped_state.state))
-                break
-            # Otherwise, we need to keep popping states until we find one we haven't seen before.
-            else:
-                popped_state = None
-        # If no new states were found, we have reached a dead end.
-        if popped_state == None:
-            print("There are no more possible moves.")
-            self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # If we've reached our goal state, we save some info and return.
-        if popped_state.state == self.goal_state:
-            self.current_state = popped_state
-            self.moves = popped_state_quadruple[3]
-            gn = popped_state.get_cost(popped_state_quadruple[3])
-            hn = popped_state.get_heuristic_mt(self.goal_state)
-            print(f"The final state w/ g(n)={gn} and h(n)={hn} is...")
-            popped_state.print_state()
-            return
-        
-        # The diameter of the puzzle is 31, so we can't have more than 31 moves.
-        if popped_state_quadruple[3] > 31:
-            print("The puzzle is unsolvable.")
+            empty_shift = shifts[empty_pos]
+            # Let's consider all the tiles we can slide into the empty tile.
+            for pos, move in neighbor_moves[empty_pos]:
+                # Sliding a tile only moves its bits from its cell into the empty cell (Board.slide, inlined).
+                shift = shifts[pos]
+                tile = (code >> shift) & mask
+                new_state = code ^ (tile << shift) ^ (tile << empty_shift)
+                # If we haven't seen this state before (or only along a longer path), we can add it to our frontier.
+                if ranked:
+                    # Sliding a tile sideways leaves the other tiles in the same order, so only the blank's part of
+                    # the rank changes. Sliding one up or down reorders them, so we rank the child from scratch.
+                    new_rank = code_rank + (pos - empty_pos) * blank_weight if move >= 2 else rank(new_state)
+                    if has_rank(new_rank):
+                        continue
+                elif new_state in was_seen:
+                    continue
+                best_g = open_g.get(new_state)
+                if best_g is not None and best_g <= num_moves:
+                    continue
+                open_g[new_state] = num_moves
+                # Only the sliding tile changes cells, so h(n) is the parent's h(n) plus that tile's delta.
+                if incremental:
+                    new_hn = hn + deltas[(tile * size + pos) * size + empty_pos]
+                else:
+                    new_hn = evaluate(new_state)
+                if check_heuristic:
+                    self.verify_heuristic(heuristic.evaluate, new_state, new_hn)
+                # As we've produced a new state, we need to increment our state id.
+                state_id += 1
+                push(g_weight * num_moves + h_weight * new_hn, num_moves, (new_state, num_moves, pos, new_hn, move, new_rank))
+            if frontier.size > max_nodes:
+                max_nodes = frontier.size
+        else:
+            # If no new states were found, we have reached a dead end.
             self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # Some helpful text to let us know we're making progress.
-        gn = popped_state.get_cost(popped_state_quadruple[3])
-        hn = popped_state.get_heuristic_mt(self.goal_state)
-        #print(f"The best state to expand w/ g(n)={gn} and h(n)={hn} is...")
-        #popped_state.print_state()
-        #print()
-        # Increment the number of nodes we've expanded.
-        self.nodes_expanded += 1
-        # Now, we can begin to process the popped state.
-        self.current_state = popped_state
-        # Storing the number of moves we've made to reach our current state.
-        num_moves = popped_state_quadruple[3]
-        self.moves = num_moves
-        # Get all the possible moves we can make from the current state.
-        possible_moves = self.get_possible_moves()
-        # Get the position of the empty tile.
-        empty_tile_pos = self.get_empty_tile_pos()
-        empty_i, empty_j = empty_tile_pos
-        # A list to store the new states we can reach from the current state.
-        new_states = []
-
-        # Let's consider all the moves we can make.
-        for move in possible_moves:
-            i,j = move
-            # Storing the number of moves we've made to reach our current state.
-            num_moves = popped_state_quadruple[3]
-            # We need a copy of the current state.
-            current_state_copy = [row[:] for row in self.current_state.state]
-            new_state = State(current_state_copy)
-            # Swap the empty tile with the tile we want to move.
-            new_state.state[empty_i][empty_j], new_state.state[i][j] = new_state.state[i][j], new_state.state[empty_i][empty_j]
-            # For A* search w/ the MD heuristic, we consider the total cost of the state.
-            num_moves += 1
-            new_state_cost = new_state.get_total_cost_mt(num_moves, self.goal_state)
-            # As we've produced a new state, we need to increment our state id.
-            self.id += 1
-            # We can then add the new state to our list of new states.
-            new_states.append((new_state_cost, self.id, new_state, num_moves))
-        
-        # Next, we need to add the states we haven't seen to our frontier.
-        # Recall that our quadruples are of the form (cost, id, state, moves).
-        for state_quadruple in new_states:
-            # We store our state (a State object).
-            state = state_quadruple[2] 
-            # If we haven't seen this state before, we can add it to our frontier.
-            if str(state.state) not in self.was_seen:
-                # We add the state triplet to our frontier.
-                heapq.heappush(self.frontier, state_quadruple)
-                self.max_nodes = max(self.max_nodes, len(self.frontier))
-
-    # Making a move into the empty tile using the EUC heuristic.
-    def make_move_using_euc(self):
-        popped_state = None
-        # As long as we have states to consider...
-        while len(self.frontier) > 0:
-            # We pop the state w/ the min cost. Recall that our quadruples are of the form (cost, id, state, moves).
-            popped_state_quadruple = heapq.heappop(self.frontier)
-            popped_state = popped_state_quadruple[2]
-            # If we haven't seen this state before, we can process it.
-            if str(popped_state.state) not in self.was_seen:
-                # Mark the state as seen as we'll be processing it now.
-                self.was_seen.add(str(popped_state.state))
+        if self.stop_reason:
+            self.moves = -1
+            self.partial = self.best_waiting(frontier, heuristic)
+
+        self.id = state_id
+        self.nodes_expanded += nodes_expanded
+        self.max_nodes = max_nodes
+
+        # Everything popped was either expanded, the goal, or a stale entry left behind by a better path
+        # (pushes that updated an entry in place never added one).
+        stats.expanded = nodes_expanded
+        stats.generated = state_id
+        stats.heuristic_evals = state_id + 1
+        stats.stale = (state_id + 1 - frontier.updates - frontier.size) - stats.expanded - found
+        stats.closed_size = len(was_seen)
+        stats.max_frontier = max_nodes
+        if self.instrument:
+            # Every expanded state looked at all of its blank's neighbors; the ones that weren't pushed were closed,
+            # or already waiting in the frontier at no higher cost.
+            # We count them here rather than in the loop, so uninstrumented runs don't pay for it.
+            looked_at = sum(len(self.board.neighbors[self.board.find_blank(code)]) for code in was_seen)
+            if found:
+                looked_at -= len(self.board.neighbors[self.board.find_blank(goal)])
+            stats.duplicates = looked_at - state_id
+        stats.finish()
+        return self.moves
+
+    # Starts the progress reports and budget checks of a search, returning the expansion count of the first check.
+    # A budget that is already exceeded (e.g. a cancelled token, or a deadline in the past) stops the search before
+    # its first expansion: stop_reason is set, and the first check comes right away.
+    def start_checks(self):
+        self.stop_reason = None
+        self.partial = None
+        self.next_report = self.progress_every
+        if self.budget:
+            self.budget.start()
+            self.stop_reason = self.budget.exceeded(0)
+            if self.stop_reason:
+                return 0
+        return self.next_check(0)
+
+    # The expansion count of our next progress report or budget check, or -1 if we have neither.
+    def next_check(self, expanded):
+        checks = []
+        if self.progress:
+            checks.append(self.next_report)
+        if self.budget:
+            checks.append(self.budget.next_check(expanded))
+        return min(checks) if checks else -1
+
+    # Reports our progress and checks our budget (setting stop_reason if it's exceeded), every so often during a
+    # search so neither costs anything per node. Returns the expansion count of the next check.
+    def checkpoint(self, expanded, generated, closed_size, max_frontier):
+        if self.progress and expanded >= self.next_report:
+            self.next_report += self.progress_every
+            self.report_progress(expanded, generated, closed_size, max_frontier)
+        if self.budget:
+            self.stop_reason = self.budget.exceeded(expanded)
+        return self.next_check(expanded)
+
+    # The board waiting in our frontier w/ the lowest h(n), as a partial result (or None if nothing is waiting).
+    # Ties go to the deepest board, so searches w/o a heuristic report how far they got.
+    def best_waiting(self, frontier, heuristic):
+        board, was_seen = self.board, self.was_seen
+        # Searches w/o a heuristic have h(n) = 0 everywhere, so we score their boards w/ the Manhattan distance.
+        evaluate = ManhattanHeuristic(board).evaluate if isinstance(heuristic, NoHeuristic) else None
+        best = best_hn = None
+        for entry in frontier.entries():
+            if entry[0] in was_seen:
+                continue
+            hn = entry[3] if evaluate is None else evaluate(entry[0])
+            if best is None or (hn, -entry[1]) < (best_hn, -best[1]):
+                best, best_hn = entry, hn
+        if best is None:
+            return None
+        code, num_moves, empty_pos, hn, move = best[:5]
+        hn = best_hn
+        # A search stopped before its first expansion has only the root waiting.
+        if move == -1:
+            return self.make_partial(code, hn, [])
+        # Its parent was expanded, so we can trace the way there and add the last move.
+        prev_pos = empty_pos - board.move_offsets[move]
+        moves = self.trace_solution(board.slide(code, empty_pos, prev_pos), prev_pos) + [board.move_names[move]]
+        return self.make_partial(code, hn, moves)
+
+    # A partial result: the best board we reached, its h(n), and the moves that reach it.
+    def make_partial(self, code, hn, moves):
+        return {'board': self.board.decode(code), 'h': hn, 'moves': len(moves), 'solution': ''.join(moves)}
+
+    # Fills in our stats so far and hands them to our progress callback.
+    def report_progress(self, expanded, generated, closed_size, max_frontier):
+        self.stats.expanded = expanded
+        self.stats.generated = generated
+        self.stats.closed_size = closed_size
+        self.stats.max_frontier = max_frontier
+        self.stats.finish()
+        self.progress(self.stats)
+
+    # Rebuilds the moves of the blank from the root to a state in O(depth), by undoing the move stored for each state
+    # in our parent map (was_seen) until we reach the root.
+    def trace_solution(self, code, empty_pos):
+        board = self.board
+        moves = []
+        move = self.was_seen[code]
+        while move != -1:
+            moves.append(board.move_names[move])
+            # The blank came from the opposite side, so we slide the tile back into the cell the blank left.
+            prev_pos = empty_pos - board.move_offsets[move]
+            code = board.slide(code, empty_pos, prev_pos)
+            empty_pos = prev_pos
+            move = self.was_seen[code]
+        moves.reverse()
+        return moves
+
+    # Iterative-deepening A* (IDA*): a depth-first search bounded by f(n) = g(n) + h(n), where the bound grows
+    # to the smallest f(n) that exceeded it on the previous pass. It keeps nothing but the current path,
+    # so memory is O(depth) and larger boards (e.g. the 15 puzzle) can be solved without a frontier.
+    # Returns the depth of the goal node, or -1 if the goal can't be reached.
+    def ida_search(self, heuristic):
+        board = self.board
+        initial_code = self.board.encode(self.initial_state.state)
+        # A single mutable board that we slide tiles on and undo as we backtrack.
+        tiles = board.unpack(initial_code)
+        goal_tiles = board.goal_tiles
+        neighbors, deltas, size = board.neighbors, heuristic.deltas, board.size
+        incremental, evaluate_tiles = heuristic.incremental, heuristic.evaluate_tiles
+        stats = self.stats = SearchStats(f"ida/{heuristic.name}")
+        evaluate = heuristic.evaluate
+        if self.instrument:
+            evaluate, evaluate_tiles = TimedEvaluate(evaluate, stats), TimedEvaluate(evaluate_tiles, stats)
+        # The cells the blank has moved through, i.e. our current path.
+        path = []
+        # Sentinels returned once the goal has been found, or once we've run out of budget (real f(n) values are
+        # never negative).
+        found, stopped = -1, -2
+        nodes_expanded = nodes_generated = 0
+        max_depth = 0
+        # When we next report our progress or check our budget (never, if we have neither).
+        next_check = self.start_checks()
+
+        # Searches below the current node, returning the smallest f(n) above the bound (or found).
+        def expand(gn, hn, empty_pos, prev_pos, bound):
+            nonlocal nodes_expanded, nodes_generated, max_depth, next_check
+            fn = gn + hn
+            if fn > bound:
+                return fn
+            # Our heuristics are 0 only at the goal, so we only compare boards when h(n) is 0.
+            if hn == 0 and tiles == goal_tiles:
+                return found
+            if nodes_expanded == next_check:
+                next_check = self.checkpoint(nodes_expanded, nodes_generated, 0, max_depth)
+                if self.stop_reason:
+                    return stopped
+            nodes_expanded += 1
+            if gn > max_depth:
+                max_depth = gn
+            next_bound = float('inf')
+            for pos in neighbors[empty_pos]:
+                # Sliding the tile straight back would only undo our last move.
+                if pos == prev_pos:
+                    continue
+                tile = tiles[pos]
+                tiles[empty_pos], tiles[pos] = tile, 0
+                path.append(pos)
+                nodes_generated += 1
+                if incremental:
+                    new_hn = hn + deltas[(tile * size + pos) * size + empty_pos]
+                else:
+                    new_hn = evaluate_tiles(tiles)
+                result = expand(gn + 1, new_hn, pos, empty_pos, bound)
+                # Either way, we leave our path as it is.
+                if result == found or result == stopped:
+                    return result
+                # Undo the move before trying the next one.
+                path.pop()
+                tiles[empty_pos], tiles[pos] = 0, tile
+                if result < next_bound:
+                    next_bound = result
+            return next_bound
+
+        empty_pos = tiles.index(0)
+        hn = evaluate(initial_code)
+        bound = hn
+        while True:
+            result = expand(0, hn, empty_pos, None, bound)
+            if result == found:
+                self.current_code = board.pack(tiles)
+                self.current_state = State(board.decode(self.current_code), self.rows, self.cols)
+                self.moves = len(path)
+                self.solution = board.path_to_moves(empty_pos, path)
+                break
+            if result == stopped:
+                self.moves = -1
+                self.partial = self.best_on_path(heuristic, initial_code, empty_pos, path)
+                break
+            # Nothing exceeded the bound, so every reachable state has been searched.
+            if result == float('inf'):
+                self.moves = -1
                 break
-            # Otherwise, we need to keep popping states until we find one we haven't seen before.
+            bound = result
+
+        self.nodes_expanded += nodes_expanded
+        # The deepest path we held is the most we ever stored at once.
+        self.max_nodes = max(self.max_nodes, max_depth)
+        stats.expanded = nodes_expanded
+        stats.generated = nodes_generated
+        stats.heuristic_evals = nodes_generated + 1
+        stats.max_frontier = max_depth
+        stats.finish()
+        return self.moves
+
+    # The board on a path (of blank cells, from the initial board) w/ the lowest h(n), as a partial result.
+    def best_on_path(self, heuristic, code, empty_pos, path):
+        board = self.board
+        start_pos = empty_pos
+        best_code, best_hn, best_depth = code, heuristic.evaluate(code), 0
+        for depth, pos in enumerate(path, 1):
+            code = board.slide(code, empty_pos, pos)
+            empty_pos = pos
+            hn = heuristic.evaluate(code)
+            if hn < best_hn:
+                best_code, best_hn, best_depth = code, hn, depth
+        moves = board.path_to_moves(start_pos, path[:best_depth])
+        return self.make_partial(best_code, best_hn, moves)
+
+    # Anytime repairing A* (ARA*): weighted A* that returns a first solution quickly, then lowers its weight and
+    # improves that solution, reusing everything it has searched so far. Every pass picks up the frontier of the one
+    # before it (re-prioritized w/ the new weight), plus the closed states it has since found shorter paths to.
+    # Boards whose g(n) + h(n) can't beat our best solution are pruned, so later passes are cheap.
+    # A generator, yielding a dict w/ every improved solution: its moves and solution, the weight that found it,
+    # and its bound (the solution is at most bound times longer than optimal; 1.0 once it's proven optimal).
+    def anytime_solutions(self, heuristic, weight=2, step=0.5, closed='dict'):
+        board = self.board
+        stats = self.stats = SearchStats(f"arastar/{heuristic.name}")
+        evaluate = heuristic.evaluate
+        if self.instrument:
+            evaluate = TimedEvaluate(evaluate, stats)
+        initial_code = board.encode(self.initial_state.state)
+        initial_hn = evaluate(initial_code)
+        # The best g(n) we've found for every board. Our parent map (was_seen) holds the move of that path,
+        # so it has an entry for every board we've generated, not only the closed ones.
+        costs, was_seen = {initial_code: 0}, ClosedSet.create(closed, board)
+        self.was_seen = was_seen
+        was_seen[initial_code] = -1
+        # Frontier entries are (board, moves, blank, h, move), as in our search core.
+        frontier = Frontier.create('heap', False)
+        frontier.push(weight * initial_hn, 0, (initial_code, 0, board.find_blank(initial_code), initial_hn, -1))
+        # States that were closed in the current pass when we found a shorter path to them: they wait for the next one.
+        inconsistent = []
+        size, shifts, mask = board.size, board.shifts, board.mask
+        neighbor_moves, goal = board.neighbor_moves, board.goal
+        deltas, incremental = heuristic.deltas, heuristic.incremental
+        # The length of our best solution so far.
+        best = float('inf')
+        nodes_expanded = nodes_generated = 0
+        max_nodes = frontier.size
+        # Every pass starts w/ an empty closed set, so we report the most boards any pass closed.
+        max_closed = 0
+        start_expanded = self.nodes_expanded
+        next_check = self.start_checks()
+        self.moves = -1
+        self.bound = float('inf')
+
+        # Fills in our stats so far.
+        def update_stats():
+            self.nodes_expanded = start_expanded + nodes_expanded
+            self.max_nodes = max(self.max_nodes, max_nodes)
+            stats.expanded = nodes_expanded
+            stats.generated = nodes_generated
+            stats.heuristic_evals = nodes_generated + 1
+            stats.closed_size = max_closed
+            stats.max_frontier = max_nodes
+            stats.finish()
+
+        while True:
+            closed = set()
+            found = False
+            push, pop = frontier.push, frontier.pop
+            while frontier.size:
+                if nodes_expanded == next_check:
+                    next_check = self.checkpoint(nodes_expanded, nodes_generated, max(max_closed, len(closed)), max_nodes)
+                    if self.stop_reason:
+                        break
+                code, num_moves, empty_pos, hn, move = pop()
+                # Entries left behind by a shorter path, and boards that can't lead to a better solution.
+                if num_moves != costs[code] or code in closed or num_moves + hn >= best:
+                    continue
+                if code == goal:
+                    best = num_moves
+                    found = True
+                    break
+                closed.add(code)
+                nodes_expanded += 1
+                num_moves += 1
+                empty_shift = shifts[empty_pos]
+                for pos, move in neighbor_moves[empty_pos]:
+                    shift = shifts[pos]
+                    tile = (code >> shift) & mask
+                    new_state = code ^ (tile << shift) ^ (tile << empty_shift)
+                    if num_moves >= costs.get(new_state, best):
+                        continue
+                    if incremental:
+                        new_hn = hn + deltas[(tile * size + pos) * size + empty_pos]
+                    else:
+                        new_hn = evaluate(new_state)
+                    if num_moves + new_hn >= best:
+                        continue
+                    costs[new_state] = num_moves
+                    was_seen[new_state] = move
+                    nodes_generated += 1
+                    entry = (new_state, num_moves, pos, new_hn, move)
+                    if new_state in closed:
+                        inconsistent.append(entry)
+                    else:
+                        push(num_moves + weight * new_hn, num_moves, entry)
+                if frontier.size > max_nodes:
+                    max_nodes = frontier.size
+            max_closed = max(max_closed, len(closed))
+
+            # Everything still waiting (w/o stale entries or boards that can't beat our best solution).
+            waiting = {}
+            for entry in list(frontier.entries()) + inconsistent:
+                code, num_moves, empty_pos, hn, move = entry
+                if num_moves == costs[code] and num_moves + hn < best:
+                    waiting[code] = entry
+            inconsistent = []
+            if self.stop_reason:
+                if best == float('inf'):
+                    self.partial = self.best_anytime(waiting.values())
+                break
+            if best == float('inf'):
+                # Nothing left to search and no solution: the goal can't be reached.
+                break
+            # Every pass ends w/ a solution at most weight times longer than optimal, and no waiting board can reach
+            # the goal in fewer than g(n) + h(n) moves. Once nothing is waiting, our solution is optimal.
+            bound = min(weight, best / min(entry[1] + entry[3] for entry in waiting.values())) if waiting else 1.0
+            # A pass that found nothing new may still have tightened our bound.
+            if found or bound < self.bound:
+                if found:
+                    self.current_code = goal
+                    self.current_state = State(board.decode(goal), self.rows, self.cols)
+                    self.moves = best
+                    self.solution = self.trace_solution(goal, board.find_blank(goal))
+                self.bound = bound
+                update_stats()
+                yield {'moves': best, 'solution': ''.join(self.solution), 'weight': weight, 'bound': bound,
+                       'expanded': nodes_expanded, 'elapsed': stats.elapsed}
+            if bound == 1.0:
+                break
+            # Our next weight is never looser than the bound we've already proven.
+            weight = max(1, min(weight - step, bound))
+            frontier = Frontier.create('heap', False)
+            for entry in waiting.values():
+                frontier.push(entry[1] + weight * entry[3], entry[1], entry)
+            max_nodes = max(max_nodes, frontier.size)
+        if self.moves == -1:
+            self.bound = None
+        update_stats()
+
+    # The board w/ the lowest h(n) among (board, moves, blank, h, move) entries, as a partial result (or None).
+    def best_anytime(self, entries):
+        best = min(entries, key=lambda entry: (entry[3], -entry[1]), default=None)
+        if best is None:
+            return None
+        code, num_moves, empty_pos, hn, move = best
+        return self.make_partial(code, hn, self.trace_solution(code, empty_pos))
+
+    # Runs anytime_solutions to the end (or until our budget runs out), handing every improved solution to our
+    # on_solution callback. Returns the depth of the best goal node found, or -1 if there was none.
+    def anytime_search(self, heuristic, weight=2, closed='dict'):
+        for solution in self.anytime_solutions(heuristic, weight, closed=closed):
+            if self.on_solution:
+                self.on_solution(solution)
+        return self.moves
+
+    # Bidirectional breadth-first search: we grow one tree from the initial state and one from the goal, a whole layer
+    # at a time (always the smaller side), until they meet. Moves all cost 1, so each tree only needs to reach about
+    # half the solution depth, which cuts the nodes expanded to roughly the square root of plain UCS.
+    # Returns the depth of the goal node, or -1 if the goal can't be reached.
+    def bidirectional_search(self):
+        board = self.board
+        initial_code = board.encode(self.initial_state.state)
+        # Each tree maps a packed state to (depth << 2) | move, where move is the code of the move that reached it.
+        # The roots are stored as 0 (depth 0).
+        forward, backward = {initial_code: 0}, {board.goal: 0}
+        # The newest layer of each tree, as (board, blank) pairs.
+        forward_layer = [(initial_code, board.find_blank(initial_code))]
+        backward_layer = [(board.goal, board.find_blank(board.goal))]
+        meeting = None if initial_code != board.goal else (0, initial_code, forward_layer[0][1])
+        stats = self.stats = SearchStats("bidirectional")
+        start_expanded = self.nodes_expanded
+        self.start_checks()
+        while meeting is None and forward_layer and backward_layer and not self.stop_reason:
+            self.max_nodes = max(self.max_nodes, len(forward_layer) + len(backward_layer))
+            if len(forward_layer) <= len(backward_layer):
+                forward_layer, meeting = self.expand_layer(forward_layer, forward, backward)
             else:
-                popped_state = None
-        # If no new states were found, we have reached a dead end.
-        if popped_state == None:
-            print("There are no more possible moves.")
-            self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-        
-        # If we've reached our goal state, we save some info and return.
-        if popped_state.state == self.goal_state:
-            self.current_state = popped_state
-            self.moves = popped_state_quadruple[3]
-            gn = popped_state.get_cost(popped_state_quadruple[3])
-            hn = popped_state.get_heuristic_md(self.goal_state, self.tile_map)
-            print(f"The final state w/ g(n)={gn} and h(n)={hn} is...")
-            popped_state.print_state()
-            return
-        
-        # The diameter of the puzzle is 31, so we can't have more than 31 moves.
-        if popped_state_quadruple[3] > 31:
-            print("The puzzle is unsolvable.")
+                backward_layer, meeting = self.expand_layer(backward_layer, backward, forward)
+            # Layers are our natural unit of progress, so we report and check our budget after each one.
+            if self.progress:
+                self.report_progress(self.nodes_expanded - start_expanded, len(forward) + len(backward) - 2,
+                                     len(forward) + len(backward), self.max_nodes)
+            if self.budget and meeting is None:
+                self.stop_reason = self.budget.exceeded(self.nodes_expanded - start_expanded)
+        if self.stop_reason:
+            # Only the forward tree knows the way from our initial board.
+            names = board.move_names
+            trace = lambda code: [names[move] for move in self.trace_tree(forward, code, board.find_blank(code))]
+            self.partial = self.best_by_md([code for code, empty_pos in forward_layer], trace)
+
+        stats.expanded = self.nodes_expanded - start_expanded
+        stats.generated = len(forward) + len(backward) - 2
+        stats.closed_size = len(forward) + len(backward)
+        stats.max_frontier = self.max_nodes
+        stats.finish()
+        if meeting is None:
+            self.moves = -1
+            return self.moves
+        self.moves, code, empty_pos = meeting
+        # The path to the meeting point, then the backward tree's moves undone in reverse order (U<->D, L<->R).
+        moves = self.trace_tree(forward, code, empty_pos)
+        moves += [move ^ 1 for move in reversed(self.trace_tree(backward, code, empty_pos))]
+        self.solution = [board.move_names[move] for move in moves]
+        self.current_code = board.goal
+        self.current_state = State(board.decode(board.goal), self.rows, self.cols)
+        return self.moves
+
+    # Expands a whole layer of one tree of our bidirectional search, checking every new state against the other tree.
+    # Returns the next layer, and the shortest (length, board, blank) meeting point in this layer (or None).
+    def expand_layer(self, layer, tree, other):
+        board = self.board
+        next_layer = []
+        meeting = None
+        for code, empty_pos in layer:
+            self.nodes_expanded += 1
+            depth = (tree[code] >> 2) + 1
+            for pos, move in board.neighbor_moves[empty_pos]:
+                new_state = board.slide(code, empty_pos, pos)
+                if new_state in tree:
+                    continue
+                tree[new_state] = (depth << 2) | move
+                next_layer.append((new_state, pos))
+                # We finish the layer before stopping, as a later state may meet the other tree closer to its root.
+                if new_state in other:
+                    length = depth + (other[new_state] >> 2)
+                    if meeting is None or length < meeting[0]:
+                        meeting = (length, new_state, pos)
+        return next_layer, meeting
+
+    # The board among packed boards w/ the lowest Manhattan distance, as a partial result (or None if there are none),
+    # for searches w/o a heuristic of their own. trace gives the moves that reach a board from our initial board.
+    def best_by_md(self, codes, trace):
+        evaluate = ManhattanHeuristic(self.board).evaluate
+        best = min(codes, key=evaluate, default=None)
+        if best is None:
+            return None
+        return self.make_partial(best, evaluate(best), trace(best))
+
+    # Rebuilds the move codes from the root of one of our bidirectional trees to a state in O(depth).
+    def trace_tree(self, tree, code, empty_pos):
+        board = self.board
+        moves = []
+        while tree[code] >> 2:
+            move = tree[code] & 3
+            moves.append(move)
+            prev_pos = empty_pos - board.move_offsets[move]
+            code = board.slide(code, empty_pos, prev_pos)
+            empty_pos = prev_pos
+        moves.reverse()
+        return moves
+
+    # Layer-synchronous breadth-first search, expanding each layer across worker processes (see LayerBFS.py).
+    # Layers are our unit of progress, so we report and check our budget after each one.
+    # Returns the depth of the goal node, or -1 if the goal can't be reached.
+    def layer_search(self, workers=1):
+        board = self.board
+        initial_code = board.encode(self.initial_state.state)
+        stats = self.stats = SearchStats("layered")
+        bfs = LayerBFS(board, workers)
+        self.start_checks()
+
+        # Called after every layer; stops the search once our budget is exceeded.
+        def check_layer():
+            if self.progress:
+                # Every board but the root was generated once, and every board we've visited is in our bitmap.
+                self.report_progress(bfs.expanded, bfs.visited - 1, bfs.visited, bfs.max_layer)
+            if self.budget:
+                self.stop_reason = self.budget.exceeded(bfs.expanded)
+            return self.stop_reason
+
+        path = bfs.path(initial_code, board.goal, check_layer) if not self.stop_reason else None
+        self.nodes_expanded += bfs.expanded
+        self.max_nodes = max(self.max_nodes, bfs.max_layer)
+        stats.expanded = bfs.expanded
+        stats.generated = bfs.visited - 1
+        stats.closed_size = bfs.visited
+        stats.max_frontier = bfs.max_layer
+        stats.finish()
+        if path is None:
+            self.moves = -1
+            if self.stop_reason:
+                # The best board of the last layer we reached (just our initial board if we stopped before the first).
+                layers = bfs.reached or [[initial_code]]
+                trace = lambda code: board.path_to_moves(board.find_blank(initial_code), bfs.trace(layers, code))
+                self.partial = self.best_by_md([int(code) for code in layers[-1]], trace)
+            return self.moves
+        self.current_code = board.goal
+        self.current_state = State(board.decode(board.goal), self.rows, self.cols)
+        self.moves = len(path)
+        self.solution = board.path_to_moves(board.find_blank(initial_code), path)
+        return self.moves
+
+    # Looks the solution up in a perfect-distance table: no search, just an O(depth) walk down the table.
+    # Returns the depth of the goal node, or -1 if the goal can't be reached.
+    def table_search(self, table):
+        initial_code = self.board.encode(self.initial_state.state)
+        self.stats = SearchStats("table")
+        path = table.solution(initial_code)
+        self.stats.expanded = len(path) if path is not None else 0
+        self.stats.finish()
+        if path is None:
+            self.moves = -1
+            return self.moves
+        self.current_code = self.board.goal
+        self.current_state = State(self.board.decode(self.current_code), self.rows, self.cols)
+        self.moves = len(path)
+        self.solution = self.board.path_to_moves(self.board.find_blank(initial_code), path)
+        # Each step of the walk looks at the neighbors of one state.
+        self.nodes_expanded += len(path)
+        return self.moves
+
+    # The algorithms we can solve with, by name.
+    algorithms = ('ucs', 'md', 'mt', 'euc', 'lc', 'wd', 'pdb', 'table', 'ida', 'bidirectional', 'weighted_md', 'greedy_md', 'anytime', 'layered')
+    # The heuristics IDA* and anytime search can use, by name.
+    ida_heuristics = {'md': ManhattanHeuristic, 'lc': LinearConflictHeuristic, 'wd': WalkingDistanceHeuristic}
+
+    # Looks an algorithm up by name, returning (label, search, args): the label names the algorithm in our summary,
+    # and search(*args) runs it. The options are the weight of weighted A*, the patterns and file path of the
+    # pattern database (or the file path of the distance table), the frontier best-first searches use
+    # ('heap', 'bucket' or 'auto', see Frontier.py), the heuristic IDA* and anytime search use ('md', 'lc' or 'wd'),
+    # whether the pattern database also looks up each board's mirror image (see PatternDatabase.py), and the closed
+    # set best-first and anytime searches use ('dict', 'ranked' or 'auto', see ClosedSet.py).
+    # Layered search expands each layer across that many worker processes.
+    # Anytime search starts at the weight of weighted A*.
+    def get_solver(self, algorithm, weight=2, patterns=None, path=None, frontier='auto', heuristic='md', mirror=False, closed='dict', workers=1):
+        board = self.board
+        if algorithm == 'ucs':
+            return "UC search", self.search, (NoHeuristic(board), Strategy.ucs(), frontier, closed)
+        if algorithm == 'md':
+            return "A* search w/ the MD heuristic", self.search, (ManhattanHeuristic(board), Strategy.astar(), frontier, closed)
+        if algorithm == 'mt':
+            return "A* search w/ the MT heuristic", self.search, (MisplacedHeuristic(board), Strategy.astar(), frontier, closed)
+        if algorithm == 'euc':
+            return "A* search w/ the EUC heuristic", self.search, (EuclideanHeuristic(board), Strategy.astar(), frontier, closed)
+        if algorithm == 'lc':
+            return "A* search w/ the MD + linear conflict heuristic", self.search, (LinearConflictHeuristic(board), Strategy.astar(), frontier, closed)
+        if algorithm == 'wd':
+            return "A* search w/ the walking distance heuristic", self.search, (WalkingDistanceHeuristic(board), Strategy.astar(), frontier, closed)
+        if algorithm == 'pdb':
+            # The database is built on first use and cached on disk (see PatternDatabase.py).
+            return "A* search w/ the PDB heuristic", self.search, (PatternDatabase.open(board, patterns, path, mirror), Strategy.astar(), frontier, closed)
+        if algorithm == 'table':
+            # Tables are built on first use and cached on disk (see DistanceTable.py). Boards too large for one
+            # fall back to A* w/ MD, which solve reports as 'md'.
+            table = DistanceTable.open(board, path)
+            if table is None:
+                return self.get_solver('md', frontier=frontier, closed=closed)
+            return "The distance table", self.table_search, (table,)
+        if algorithm in ('ida', 'anytime') and heuristic not in self.ida_heuristics:
+            raise ValueError(f"Unknown heuristic '{heuristic}', expected one of {', '.join(self.ida_heuristics)}.")
+        if algorithm == 'ida':
+            return f"IDA* search w/ the {heuristic.upper()} heuristic", self.ida_search, (self.ida_heuristics[heuristic](board),)
+        if algorithm == 'bidirectional':
+            return "Bidirectional BFS", self.bidirectional_search, ()
+        if algorithm == 'layered':
+            if LayerBFS is None:
+                raise ValueError("Layered search needs NumPy.")
+            return f"Layered BFS ({workers} processes)", self.layer_search, (workers,)
+        if algorithm == 'weighted_md':
+            return f"Weighted A* search (w={weight}) w/ the MD heuristic", self.search, (ManhattanHeuristic(board), Strategy.weighted_astar(weight), frontier, closed)
+        if algorithm == 'greedy_md':
+            return "Greedy best-first search w/ the MD heuristic", self.search, (ManhattanHeuristic(board), Strategy.greedy(), frontier, closed)
+        if algorithm == 'anytime':
+            return f"Anytime A* search (w={weight} down to 1) w/ the {heuristic.upper()} heuristic", self.anytime_search, (self.ida_heuristics[heuristic](board), weight, closed)
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {', '.join(self.algorithms)}.")
+
+    # Solves the problem by name (see get_solver for the options).
+    # Returns the depth of the goal node, or -1 if the goal can't be reached.
+    def run(self, algorithm, **options):
+        return self.solve(algorithm, **options).moves
+
+    # Solves the problem by name (see get_solver for the options), returning a SearchResult.
+    # We never print: our reporter, if we have one, is told when the search starts and what it found.
+    def solve(self, algorithm, budget=None, **options):
+        label, search, args = self.get_solver(algorithm, **options)
+        # We report the algorithm that actually ran, i.e. A* w/ MD when there's no distance table.
+        if algorithm == 'table' and search != self.table_search:
+            algorithm = 'md'
+        # A budget given here only limits this solve (self.budget, if set, limits every solve w/o one).
+        previous_budget = self.budget
+        if budget is not None:
+            self.budget = budget
+        try:
+            return self.solve_with(algorithm, label, search, args, options)
+        finally:
+            self.budget = previous_budget
+
+    # Runs a solver found by get_solver (see solve), returning a SearchResult.
+    def solve_with(self, algorithm, label, search, args, options):
+        # Boards we never search get empty stats.
+        self.stats = SearchStats(algorithm)
+        self.stats.finish()
+        self.stop_reason = self.partial = self.bound = None
+        # Every solve starts over from our initial state, so nothing of an earlier solve leaks into its result.
+        self.current_state = self.initial_state
+        self.current_code = self.board.encode(self.initial_state.state)
+        self.solution = []
+        self.moves = self.nodes_expanded = self.max_nodes = 0
+        cached = None
+        if self.current_code == self.board.goal:
+            self.moves = 0
+        # Half of all boards can never reach the goal, so we check the parity before searching.
+        elif not self.board.is_solvable(self.current_code):
             self.moves = -1 # Setting the number of moves to -1 to indicate that the puzzle is unsolvable.
-            return
-
-        # Some helpful text to let us know we're making progress.
-        gn = popped_state.get_cost(popped_state_quadruple[3])
-        hn = popped_state.get_heuristic_euc(self.goal_state, self.tile_map)
-        print(f"The best state to expand w/ g(n)={gn} and h(n)={hn} is...")
-        popped_state.print_state()
-        print()
-        # Increment the number of nodes we've expanded.
-        self.nodes_expanded += 1
-        # Now, we can begin to process the popped state.
-        self.current_state = popped_state
-        # Storing the number of moves we've made to reach our current state.
-        num_moves = popped_state_quadruple[3]
-        self.moves = num_moves
-        # Get all the possible moves we can make from the current state.
-        possible_moves = self.get_possible_moves()
-        # Get the position of the empty tile.
-        empty_tile_pos = self.get_empty_tile_pos()
-        empty_i, empty_j = empty_tile_pos
-        # A list to store the new states we can reach from the current state.
-        new_states = []
-
-        # Let's consider all the moves we can make.
-        for move in possible_moves:
-            i, j = move
-            # Storing the number of moves we've made to reach our current state.
-            num_moves = popped_state_quadruple[3]
-            # We need a copy of the current state.
-            current_state_copy = [row[:] for row in self.current_state.state]
-            new_state = State(current_state_copy)
-            # Swap the empty tile with the tile we want to move.
-            new_state.state[empty_i][empty_j], new_state.state[i][j] = new_state.state[i][j], new_state.state[empty_i][empty_j]
-            # For A* search w/ the EUC heuristic, we consider the total cost of the state.
-            num_moves += 1
-            new_state_cost = new_state.get_total_cost_euc(num_moves, self.goal_state, self.tile_map)
-            # As we've produced a new state, we need to increment our state id.
-            self.id += 1
-            # We can then add the new state to our list of new states.
-            new_states.append((new_state_cost, self.id, new_state, num_moves))
-
-        # Next, we need to add the states we haven't seen to our frontier.
-        # Recall that our quadruples are of the form (cost, id, state, moves).
-        for state_quadruple in new_states:
-            # We store our state (a State object).
-            state = state_quadruple[2]
-            # If we haven't seen this state before, we can add it to our frontier.
-            if str(state.state) not in self.was_seen:
-                # We add the state triplet to our frontier.
-                heapq.heappush(self.frontier, state_quadruple)
-                self.max_nodes = max(self.max_nodes, len(self.frontier))
+        else:
+            # Mirrored boards share a cache entry, stored as the solution of their symmetry class's representative.
+            canonical, transposed = self.board.canonical(self.current_code)
+            key = self.cache.key(self.board, canonical, algorithm, options) if self.cache else None
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                self.load_cached(cached, transposed)
+            else:
+                if self.reporter:
+                    self.reporter.start(self, label)
+                search(*args)
+                self.stats.algorithm = algorithm
+                # Searches cut short by their budget say nothing about the board, so we don't cache them.
+                if key and not self.stop_reason:
+                    solution = self.board.mirror_moves(self.solution) if transposed else self.solution
+                    self.cache.put(key, {'moves': self.moves, 'solution': ''.join(solution), 'stats': self.stats.as_dict(), 'bound': self.bound})
+
+        # Anytime search may run out of budget after it has found a solution, which is still ours to return.
+        if self.stop_reason and self.moves == -1:
+            status = SearchResult.BUDGET_EXCEEDED
+        else:
+            status = SearchResult.SOLVED if self.moves != -1 else SearchResult.UNSOLVABLE
+        # Cached results report the metrics of the search that found them.
+        nodes_expanded, max_nodes = (self.stats.expanded, self.stats.max_frontier) if cached else (self.nodes_expanded, self.max_nodes)
+        result = SearchResult(algorithm, label, status, self.moves, self.solution, self.current_state,
+                              nodes_expanded, max_nodes, self.stats, cached is not None, self.stop_reason, self.partial, self.bound)
+        if self.reporter:
+            self.reporter.finish(result)
+        return result
+
+    # Takes the result of an earlier search from our cache, mirroring its moves if it solved our mirror image.
+    # The stats are those of that search.
+    def load_cached(self, cached, transposed=False):
+        self.moves = cached['moves']
+        self.solution = list(cached['solution'])
+        if transposed:
+            self.solution = self.board.mirror_moves(self.solution)
+        self.stats = SearchStats.from_dict(cached['stats'])
+        self.bound = cached.get('bound')
+        if self.moves != -1:
+            self.current_code = self.board.goal
+            self.current_state = State(self.board.decode(self.current_code), self.rows, self.cols)
 
     # Solve the problem using Uniform Cost Search.
-    def solve_using_ucs(self):
-        # Resetting the state id.
-        self.id = 0
-        # Defining our initial setup: the initial cost, the state id, the state itself, and the moves we've made.
-        initial_cost = 0
-        # Every quadruple in the heap is of the form (cost, id, state, moves).
-        initial_setup = [(initial_cost, self.id, self.initial_state, 0)]
-        heapq.heapify(initial_setup)
-        # Our frontier is implemented as a min heap.
-        self.frontier = initial_setup
-
-        if self.current_state.state == self.goal_state:
-            print("You already have the goal state.")
-            return
-
-        # We will begin processing the initial state.
-        print("\nExpanding the initial state...")
-
-        # As long as we haven't reached the goal state...
-        while self.current_state.state != self.goal_state:
-            # We make a move using Uniform Cost Search.
-            self.make_move_using_ucs()
-            # If the number of moves is -1, the puzzle is unsolvable.
-            if self.moves == -1:
-                print("The solution to this puzzle configuration is not possible.")
-                return
-        
-        # Once we've reached the goal state, we've completed the puzzle using UCS.
-        print()
-        print("You have solved the puzzle!")
-        print("Final State: ")
-        self.print_current_state()
-        print()
-        # We print the number of nodes we've expanded, the max nodes in our frontier, and the depth of the goal node.
-        print(f"To solve this problem, UC search expanded a total of {self.nodes_expanded} nodes.")
-        print(f"The maximum number of nodes in the frontier at any given time was: {self.max_nodes}")
-        print("The depth of the goal node is: ", self.get_moves())
-        print()
+    def solve_using_ucs(self, budget=None):
+        return self.solve('ucs', budget)
 
     # Solve the problem using the MD heuristic.
-    def solve_using_md(self):
-        # Resetting the state id.
-        self.id = 0
-        # Defining our initial setup: the initial cost, the state id, the state itself, and the moves we've made.
-        initial_cost = 0
-        # Every quadruple in the heap is of the form (cost, id, state, moves).
-        initial_setup = [(initial_cost, self.id, self.initial_state, 0)]
-        heapq.heapify(initial_setup)
-        # Our frontier is implemented as a min heap.
-        self.frontier = initial_setup
-
-        if self.current_state.state == self.goal_state:
-            print("You already have the goal state.")
-            return
-
-        # We will begin processing the initial state.
-        print("\nExpanding the initial state...")
-
-        # As long as we haven't reached the goal state...
-        while self.current_state.state != self.goal_state:
-            # We make a move using the MD heuristic.
-            self.make_move_using_md()
-            # If the number of moves is -1, the puzzle is unsolvable.
-            if self.moves == -1:
-                print("The solution to this puzzle configuration is not possible.")
-                return
-
-        # Once we've reached the goal state, we claim our VICTORY!
-        print()
-        print("You have solved the puzzle!")
-        print("Final State: ")
-        self.print_current_state()
-        print()
-        # We print the number of nodes we've expanded, the max nodes in our frontier, and the depth of the goal node.
-        print(f"To solve this problem, A* search w/ the MD heuristic expanded a total of {self.nodes_expanded} nodes.")
-        print(f"The maximum number of nodes in the frontier at any given time was: {self.max_nodes}")
-        print("The depth of the goal node is: ", self.get_moves())
-        print()
+    def solve_using_md(self, budget=None):
+        return self.solve('md', budget)
 
     # Solve the problem using the Misplaced Tiles heuristic.
-    def solve_using_mt(self):
-        # Resetting the state id.
-        self.id = 0
-        # Defining our initial setup: the initial cost, the state id, the state itself, and the moves we've made.
-        initial_cost = 0
-        # Every quadruple in the heap is of the form (cost, id, state, moves).
-        initial_setup = [(initial_cost, self.id, self.initial_state, 0)]
-        heapq.heapify(initial_setup)
-        # Our frontier is implemented as a min heap.
-        self.frontier = initial_setup
-
-        if self.current_state.state == self.goal_state:
-            print("You already have the goal state.")
-            return
-
-        # We will begin processing the initial state.
-        print("\nExpanding the initial state...")
-
-        # As long as we haven't reached the goal state...
-        while self.current_state.state != self.goal_state:
-            # We make a move using the MT heuristic.
-            self.make_move_using_mt()
-            # If the number of moves is -1, the puzzle is unsolvable.
-            if self.moves == -1:
-                print("The solution to this puzzle configuration is not possible.")
-                return
-
-        # Once we've reached the goal state, we claim our VICTORY!
-        print()
-        print("You have solved the puzzle!")
-        print("Final State: ")
-        self.print_current_state()
-        print()
-        # We print the number of nodes we've expanded, the max nodes in our frontier, and the depth of the goal node.
-        print(f"To solve this problem, A* search w/ the MT heuristic expanded a total of {self.nodes_expanded} nodes.")
-        print(f"The maximum number of nodes in the frontier at any given time was: {self.max_nodes}")
-        print("The depth of the goal node is: ", self.get_moves())
-        print()
-
+    def solve_using_mt(self, budget=None):
+        return self.solve('mt', budget)
 
     # Solve the problem using the EUC heuristic.
-    def solve_using_euc(self):
-        # Resetting the state id.
-        self.id = 0
-        # Defining our initial setup: the initial cost, the state id, the state itself, and the moves we've made.
-        initial_cost = 0
-        # Every quadruple in the heap is of the form (cost, id, state, moves).
-        initial_setup = [(initial_cost, self.id, self.initial_state, 0)]
-        heapq.heapify(initial_setup)
-        # Our frontier is implemented as a min heap.
-        self.frontier = initial_setup
-
-        if self.current_state.state == self.goal_state:
-            print("You already have the goal state.")
-            return
-
-        # We will begin processing the initial state.
-        print("\nExpanding the initial state...")
-
-        # As long as we haven't reached the goal state...
-        while self.current_state.state != self.goal_state:
-            # We make a move using the EUC heuristic.
-            self.make_move_using_euc()
-            # If the number of moves is -1, the puzzle is unsolvable.
-            if self.moves == -1:
-                print("The solution to this puzzle configuration is not possible.")
-                return
-
-        # Once we've reached the goal state, we claim our VICTORY!
-        print()
-        print("You have solved the puzzle!")
-        print("Final State: ")
-        self.print_current_state()
-        print()
-        # We print the number of nodes we've expanded, the max nodes in our frontier, and the depth of the goal node.
-        print(f"To solve this problem, A* search w/ the EUC heuristic expanded a total of {self.nodes_expanded} nodes.")
-        print(f"The maximum number of nodes in the frontier at any given time was: {self.max_nodes}")
-        print("The depth of the goal node is: ", self.get_moves())
-        print()
+    def solve_using_euc(self, budget=None):
+        return self.solve('euc', budget)
+
+    # Solve the problem using A* w/ the Manhattan distance plus linear conflicts.
+    def solve_using_lc(self, budget=None):
+        return self.solve('lc', budget)
+
+    # Solve the problem using A* w/ the walking distance heuristic.
+    def solve_using_wd(self, budget=None):
+        return self.solve('wd', budget)
+
+    # Solve the problem using A* w/ an additive pattern database heuristic.
+    def solve_using_pdb(self, patterns=None, path=None, mirror=False, budget=None):
+        return self.solve('pdb', budget, patterns=patterns, path=path, mirror=mirror)
+
+    # Solve the problem by looking it up in a perfect-distance table (see DistanceTable.py).
+    def solve_using_table(self, path=None, budget=None):
+        return self.solve('table', budget, path=path)
+
+    # Solve the problem using IDA* (memory-bounded, for larger boards) w/ the 'md', 'lc' or 'wd' heuristic.
+    def solve_using_ida(self, heuristic='md', budget=None):
+        return self.solve('ida', budget, heuristic=heuristic)
+
+    # Solve the problem using bidirectional breadth-first search (UCS from both ends).
+    def solve_using_bidirectional(self, budget=None):
+        return self.solve('bidirectional', budget)
+
+    # Solve the problem using a layer-synchronous BFS across that many processes (needs NumPy).
+    def solve_using_layered(self, workers=1, budget=None):
+        return self.solve('layered', budget, workers=workers)
+
+    # Solve the problem using weighted A* w/ the MD heuristic (bounded suboptimal).
+    def solve_using_weighted_md(self, weight=2, budget=None):
+        return self.solve('weighted_md', budget, weight=weight)
+
+    # Solve the problem using greedy best-first search w/ the MD heuristic (fast, not optimal).
+    def solve_using_greedy_md(self, budget=None):
+        return self.solve('greedy_md', budget)
+
+    # Solve the problem using anytime A*, from weighted A* (w=weight) down to an optimal solution, handing every
+    # improved solution to on_solution. Stopped by a budget, it returns its best solution so far.
+    def solve_using_anytime(self, weight=2, heuristic='md', on_solution=None, budget=None):
+        # Like a budget, a callback given here only hears about this solve.
+        previous_callback = self.on_solution
+        if on_solution is not None:
+            self.on_solution = on_solution
+        try:
+            return self.solve('anytime', budget, weight=weight, heuristic=heuristic)
+        finally:
+            self.on_solution = previous_callback
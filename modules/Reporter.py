@@ -0,0 +1,55 @@
+# Console output for our solver, used by main.py.
+# Problem never prints: set problem.reporter to a ConsoleReporter to print its progress and results.
+class ConsoleReporter:
+    def __init__(self, verbose=False):
+        # Verbose reporters also print a progress line every problem.progress_every expansions.
+        self.verbose = verbose
+
+    # Called right before a search starts.
+    def start(self, problem, label):
+        # We will begin processing the initial state.
+        print("\nExpanding the initial state...")
+        if self.verbose and problem.progress is None:
+            problem.progress = self.progress
+
+    # Prints a line of search progress (see SearchStats.py).
+    def progress(self, stats):
+        print(f"  ...{stats.expanded} nodes expanded, {stats.closed_size} closed, "
+              f"at most {stats.max_frontier} in the frontier ({stats.elapsed:.2f}s)")
+
+    # Prints the result of a solve (see Result.py).
+    def finish(self, result):
+        if result.solved and result.moves == 0:
+            print("You already have the goal state.")
+            return
+        if result.status == result.BUDGET_EXCEEDED:
+            print(f"We stopped searching ({result.reason.replace('_', ' ')}) after expanding {result.nodes_expanded} nodes.")
+            if result.partial:
+                print(f"The closest state we reached (h(n) = {result.partial['h']}, {result.partial['moves']} moves in):")
+                for row in result.partial['board']:
+                    print(row)
+                print("The moves of the blank that reach it are: ", ' '.join(result.partial['solution']))
+            return
+        # If the number of moves is -1, the puzzle is unsolvable.
+        if not result.solved:
+            print("The solution to this puzzle configuration is not possible.")
+            return
+
+        # Once we've reached the goal state, we claim our VICTORY!
+        print()
+        print("You have solved the puzzle!")
+        print("Final State: ")
+        result.final_state.print_state()
+        print()
+        # We print the number of nodes we've expanded, the max nodes in our frontier, and the depth of the goal node.
+        if result.cached:
+            print("We've solved this puzzle before, so we took the solution from our cache.")
+        if result.reason:
+            print(f"We stopped searching ({result.reason.replace('_', ' ')}), so this is our best solution so far.")
+        if result.bound is not None and result.bound > 1:
+            print(f"This solution is at most {result.bound:.2f} times as long as the optimal one.")
+        print(f"To solve this problem, {result.label} expanded a total of {result.nodes_expanded} nodes.")
+        print(f"The maximum number of nodes in the frontier at any given time was: {result.max_nodes}")
+        print("The depth of the goal node is: ", result.moves)
+        print("The moves of the blank are: ", ' '.join(result.solution))
+        print()
@@ -0,0 +1,58 @@
+# The result of solving a single board, as returned by Problem.solve.
+# Solving never prints anything; hand a result to a reporter (see Reporter.py) to show it.
+class SearchResult:
+    # The outcomes of a solve.
+    SOLVED = 'solved'
+    UNSOLVABLE = 'unsolvable'
+    # The search ran out of its budget (see Budget.py) before it could tell.
+    BUDGET_EXCEEDED = 'budget_exceeded'
+
+    def __init__(self, algorithm, label, status, moves, solution, final_state, nodes_expanded, max_nodes, stats, cached=False, reason=None, partial=None, bound=None):
+        # The algorithm we solved with, by name and by description.
+        self.algorithm = algorithm
+        self.label = label
+        # One of the outcomes above.
+        self.status = status
+        # The depth of the goal node (-1 if it can't be reached), and the moves of the blank that reach it.
+        self.moves = moves
+        self.solution = solution
+        # The state we ended in (the goal, if we solved the puzzle).
+        self.final_state = final_state
+        # The number of nodes we expanded, and the most nodes our frontier held at once.
+        self.nodes_expanded = nodes_expanded
+        self.max_nodes = max_nodes
+        # The detailed statistics of the search (see SearchStats.py).
+        self.stats = stats
+        # Whether we took the result from a SolutionCache instead of searching (the stats are then the original search's).
+        self.cached = cached
+        # Why a search ran out of budget ('max_expansions', 'deadline' or 'cancelled'), and the closest board to the
+        # goal (by h(n)) it had reached, as a dict w/ the board, h, moves and solution (None if there was none).
+        self.reason = reason
+        self.partial = partial
+        # How much longer than optimal our solution may be (1.0 if it's optimal), for algorithms that know.
+        self.bound = bound
+
+    # Whether we reached the goal.
+    @property
+    def solved(self):
+        return self.status == self.SOLVED
+
+    # Our result as a dictionary, e.g. for JSON.
+    def as_dict(self):
+        return {
+            'algorithm': self.algorithm,
+            'status': self.status,
+            'moves': self.moves,
+            'solution': ''.join(self.solution),
+            'final_state': self.final_state.state,
+            'nodes_expanded': self.nodes_expanded,
+            'max_nodes': self.max_nodes,
+            'stats': self.stats.as_dict(),
+            'cached': self.cached,
+            'reason': self.reason,
+            'partial': self.partial,
+            'bound': self.bound,
+        }
+
+    def __repr__(self):
+        return f"SearchResult({self.algorithm}, {self.status}, moves={self.moves}, nodes_expanded={self.nodes_expanded})"
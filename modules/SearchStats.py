@@ -0,0 +1,107 @@
+# The statistics of a single search, filled in by every solver in Problem.
+# Counts that can be derived after the search (nodes generated, stale frontier entries, closed set size, peak RSS)
+# are always reported. Timings and duplicate counts need extra work in the hot loop, so they are only collected
+# when the problem's instrument flag is on; the timers wrap the frontier and heuristic, so when it's off the search
+# runs exactly the same code as without instrumentation.
+import sys
+import time
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where we simply don't report the peak RSS.
+    resource = None
+
+class SearchStats:
+    def __init__(self, algorithm=''):
+        # The algorithm that produced these stats.
+        self.algorithm = algorithm
+        # Nodes expanded (popped and their children generated) and nodes generated (pushed onto the frontier).
+        self.expanded = 0
+        self.generated = 0
+        # Frontier entries popped after their state was already closed (lazy duplicates).
+        self.stale = 0
+        # Children skipped because their state was already closed (instrumented runs only).
+        self.duplicates = None
+        # Heuristic evaluations. Incremental heuristics are evaluated once per generated child through their delta
+        # table, inline in the search loop, so only full evaluations (the root, pattern databases, ...) are timed.
+        self.heuristic_evals = 0
+        self.heuristic_time = None
+        # Time spent pushing onto and popping off the frontier (instrumented runs only).
+        self.push_time = None
+        self.pop_time = None
+        # The number of closed states, and the most states our frontier held at once.
+        self.closed_size = 0
+        self.max_frontier = 0
+        # The peak resident set size of this process so far, in KB.
+        self.peak_rss_kb = None
+        # The wall time of the search, in seconds.
+        self.elapsed = 0.0
+        self.start = time.perf_counter()
+
+    # Marks the end of the search.
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+        if resource is not None:
+            # ru_maxrss is in KB on Linux, but in bytes on macOS.
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak_rss_kb = peak // 1024 if sys.platform == 'darwin' else peak
+
+    # Our stats as a dictionary, e.g. for JSON or metrics exporters.
+    def as_dict(self):
+        return {key: value for key, value in vars(self).items() if key != 'start'}
+
+    # Rebuilds stats from as_dict, e.g. for results read back from a cache.
+    @classmethod
+    def from_dict(cls, values):
+        stats = cls()
+        vars(stats).update(values)
+        return stats
+
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value}" for key, value in self.as_dict().items() if value is not None)
+        return f"SearchStats({fields})"
+
+
+# Wraps a frontier to time its pushes and pops into a SearchStats object (instrumented runs only).
+class TimedFrontier:
+    def __init__(self, frontier, stats):
+        self.frontier = frontier
+        self.stats = stats
+        self.stats.push_time = 0.0
+        self.stats.pop_time = 0.0
+
+    @property
+    def size(self):
+        return self.frontier.size
+
+    @property
+    def updates(self):
+        return self.frontier.updates
+
+    def push(self, priority, gn, entry):
+        start = time.perf_counter()
+        self.frontier.push(priority, gn, entry)
+        self.stats.push_time += time.perf_counter() - start
+
+    def pop(self):
+        start = time.perf_counter()
+        entry = self.frontier.pop()
+        self.stats.pop_time += time.perf_counter() - start
+        return entry
+
+    def entries(self):
+        return self.frontier.entries()
+
+
+# Wraps a heuristic's full evaluation to time it into a SearchStats object (instrumented runs only).
+class TimedEvaluate:
+    def __init__(self, evaluate, stats):
+        self.evaluate = evaluate
+        self.stats = stats
+        self.stats.heuristic_time = 0.0
+
+    def __call__(self, value):
+        start = time.perf_counter()
+        h_val = self.evaluate(value)
+        self.stats.heuristic_time += time.perf_counter() - start
+        return h_val
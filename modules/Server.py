@@ -0,0 +1,190 @@
+# A long-running solve server, so clients don't pay for interpreter startup and table loading on every board.
+# Requests and responses are newline-delimited JSON, read from stdin (answered on stdout) or from local TCP
+# connections. I/O runs on asyncio while the solves themselves run in a pool of worker processes, which keep their
+# tables (pattern databases, distance tables, heuristic tables) open between requests.
+#
+# A request:  {"id": 1, "board": [[8,7,1],[6,0,2],[5,4,3]], "algorithm": "md", "timeout": 5}
+#             Boards must be of a shape the server was started for, and table-backed algorithms ('pdb' and 'table')
+#             only serve the standard goals of the tables the server warmed up front: requests never build a table.
+#             Optional fields: "goal" (defaults to the standard goal of the board's shape), "options" (the search
+#             options of Problem.get_solver listed in allowed_options, e.g. {"weight": 3}) and "timeout" (seconds,
+#             defaults to the server's).
+# A response: the request's id, a status ('solved', 'unsolvable', 'budget_exceeded', 'timeout' or 'error'), and for
+#             solves, the fields of SearchResult.as_dict plus the solve time; responses arrive in completion order.
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+# Importing our classes.
+from modules.State import State
+from modules.Problem import Problem
+from modules.Generator import Generator
+from modules.Budget import Budget
+
+# The algorithms backed by precomputed tables, which we only serve once we've opened their tables.
+table_algorithms = ('pdb', 'table')
+
+# The options of Problem.get_solver a client may set. Everything else is ours to choose: table files (clients must
+# not make us write a table over any file they name) and worker processes (each worker is already one of our pool).
+allowed_options = ('weight', 'frontier', 'closed', 'heuristic', 'mirror')
+
+# Opens everything the given algorithms need for the standard goal of every (rows, cols) shape, so the first requests
+# don't wait for it. We run it once before the pool starts (so workers don't all build the same table) and in every worker.
+def warm_tables(algorithms, shapes=((3, 3),)):
+    for rows, cols in shapes:
+        goal_state = Generator.standard_goal(rows, cols)
+        for algorithm in algorithms:
+            Problem(State(goal_state), goal_state).get_solver(algorithm)
+
+# Checks a request's options, returning them if a client may set them all.
+def check_options(options):
+    if not isinstance(options, dict):
+        raise TypeError("The options must be an object.")
+    rejected = [name for name in options if name not in allowed_options]
+    if rejected:
+        raise ValueError(f"Options not allowed: {', '.join(map(str, rejected))} (expected some of {', '.join(allowed_options)}).")
+    return options
+
+# Solves a single board inside a worker, giving up at the deadline (a time.monotonic(), which is shared by every
+# process on the machine).
+def solve_request(puzzle, goal_state, algorithm, options, deadline):
+    start = time.perf_counter()
+    result = Problem(State(puzzle), goal_state).solve(algorithm, Budget(deadline=deadline), **options)
+    return {**result.as_dict(), 'time': time.perf_counter() - start}
+
+
+class SolveServer:
+    def __init__(self, workers=None, max_pending=None, timeout=30.0, warm=(), shapes=((3, 3),)):
+        # The number of worker processes, and the most requests we accept before we stop reading new ones.
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        # The default time limit of a request, in seconds, and how much longer we wait for a solve to stop itself.
+        self.timeout = timeout
+        self.grace = 1.0
+        # The algorithms whose tables we open up front, and the (rows, cols) board shapes we open them for (and the
+        # only shapes we solve).
+        self.warm = tuple(warm)
+        self.shapes = tuple(shapes)
+        self.executor = None
+        self.pending = None
+
+    # Starts our worker pool.
+    def start(self):
+        warm_tables(self.warm, self.shapes)
+        self.executor = self.new_executor()
+        # Shared by every client, so the pool's queue never holds more than max_pending requests.
+        self.pending = asyncio.Semaphore(self.max_pending)
+
+    # A fresh pool of workers, each of which opens our tables as it starts.
+    def new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=warm_tables, initargs=(self.warm, self.shapes))
+
+    # Replaces a broken pool: once a worker dies (e.g. killed, or out of memory), the pool fails every later request.
+    def restart(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self.new_executor()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    # Answers requests from stdin on stdout until stdin is closed.
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        # Reading stdin in a thread works for pipes, files and terminals alike.
+        async def readline():
+            return await loop.run_in_executor(None, sys.stdin.buffer.readline)
+        async def write(line):
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+        await self.handle(readline, write)
+
+    # Answers requests from TCP connections until cancelled.
+    async def serve_tcp(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    # Answers the requests of a single TCP connection.
+    async def connection(self, reader, writer):
+        async def write(line):
+            writer.write(line.encode() + b'\n')
+            # Waits while the client isn't reading, so slow clients hold up their own requests and nobody else's.
+            await writer.drain()
+        try:
+            await self.handle(reader.readline, write)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # Reads requests until the input ends, solving up to max_pending of them at once (across every client).
+    # A request waits for a free slot before we read the next one, which pushes back on clients that send faster than
+    # we solve; idle clients hold no slot.
+    async def handle(self, readline, write):
+        tasks = set()
+        while True:
+            try:
+                line = await readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                # The line was longer than the stream's limit. The stream drops it, so we can go on to the next one.
+                await write(json.dumps({'id': None, 'status': 'error', 'error': "The request line is too long."}))
+                continue
+            if not line:
+                break
+            if not line.strip():
+                continue
+            await self.pending.acquire()
+            task = asyncio.ensure_future(self.respond(line, write))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    # Solves a request and writes its response, then frees its slot.
+    async def respond(self, line, write):
+        try:
+            response = await self.solve(line)
+            await write(json.dumps(response))
+        finally:
+            self.pending.release()
+
+    # Solves a single request line, returning the response.
+    async def solve(self, line):
+        request_id = None
+        executor = self.executor
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            puzzle = request['board']
+            standard_goal = Generator.standard_goal(len(puzzle), len(puzzle[0]))
+            goal_state = request.get('goal') or standard_goal
+            # Tables and heuristics grow w/ the board (some as size**3), so we only solve the shapes we were started for.
+            shape = (len(goal_state), len(goal_state[0]))
+            if shape not in self.shapes:
+                raise ValueError(f"Boards must be one of {', '.join(f'{rows}x{cols}' for rows, cols in self.shapes)}.")
+            algorithm = request.get('algorithm', 'md')
+            if algorithm in table_algorithms and (algorithm not in self.warm or goal_state != standard_goal):
+                raise ValueError(f"'{algorithm}' is only served for the standard goals of the tables we opened at startup.")
+            options = check_options(request.get('options', {}))
+            timeout = request.get('timeout', self.timeout)
+            # The deadline covers the time a request waits for a worker too. A solve stops itself at the deadline
+            # (answering 'budget_exceeded' w/ its best partial result); we only give up on it ourselves if it
+            # doesn't answer soon after.
+            deadline = time.monotonic() + timeout
+            future = asyncio.get_running_loop().run_in_executor(executor, solve_request, puzzle, goal_state, algorithm, options, deadline)
+            result = await asyncio.wait_for(future, timeout + self.grace)
+            return {'id': request_id, **result}
+        except asyncio.TimeoutError:
+            return {'id': request_id, 'status': 'timeout', 'error': f"No solution within {timeout} seconds."}
+        except BrokenProcessPool as error:
+            # Requests that were in flight all see the same broken pool, and only the first one replaces it.
+            if self.executor is executor:
+                self.restart()
+            return {'id': request_id, 'status': 'error', 'error': str(error) or type(error).__name__}
+        # Every request gets an answer, whatever went wrong w/ it (e.g. JSON too deeply nested to parse).
+        except Exception as error:
+            return {'id': request_id, 'status': 'error', 'error': str(error) or type(error).__name__}
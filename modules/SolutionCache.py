@@ -0,0 +1,91 @@
+# A cache of solved boards, so repeated queries don't search again.
+# Results are keyed by the board shape, goal, board, algorithm and options, and held in an in-memory LRU of at most
+# capacity entries. Given a path, results are also written to a SQLite database, which survives restarts and backs
+# the LRU: a board evicted from memory (or solved by an earlier run) is read back from disk.
+#
+# Usage: problem.cache = SolutionCache(10000, 'tables/solutions.db'), then solve as usual.
+import json
+import sqlite3
+from collections import OrderedDict
+
+class SolutionCache:
+    def __init__(self, capacity=10000, path=None):
+        # The most results we keep in memory.
+        if capacity < 1:
+            raise ValueError("A solution cache needs a capacity of at least 1.")
+        self.capacity = capacity
+        # Our results in least to most recently used order.
+        self.entries = OrderedDict()
+        # Where our results are stored on disk (None to keep them in memory only).
+        self.path = path
+        self.database = None
+        if path is not None:
+            self.database = sqlite3.connect(path)
+            self.database.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            self.database.commit()
+        # Lookups answered from memory and from disk, lookups we couldn't answer, and results evicted from memory.
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # The key of a board: its shape, goal layout, tiles (as hex), algorithm and options.
+    @staticmethod
+    def key(board, code, algorithm, options):
+        goal = ''.join(format(tile, 'x') for tile in board.goal_tiles)
+        tiles = '.'.join(format(tile, 'x') for tile in board.unpack(code))
+        settings = ','.join(f"{name}={value!r}" for name, value in sorted(options.items()))
+        return f"{board.rows}x{board.cols}:{goal}:{tiles}:{algorithm}:{settings}"
+
+    # Looks a result (a dictionary, see Problem.solve) up, or returns None.
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.database is not None:
+            row = self.database.execute("SELECT result FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                result = json.loads(row[0])
+                self.remember(key, result)
+                return result
+        self.misses += 1
+        return None
+
+    # Stores a result (a dictionary of JSON values).
+    def put(self, key, result):
+        self.remember(key, result)
+        if self.database is not None:
+            self.database.execute("INSERT OR REPLACE INTO solutions (key, result) VALUES (?, ?)", (key, json.dumps(result)))
+            self.database.commit()
+
+    # Adds a result to our LRU, evicting the least recently used ones past our capacity.
+    def remember(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    # Our counters, e.g. to size the cache: a high eviction count w/ many disk hits means memory is too small.
+    def counters(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    # Empties the in-memory LRU (the database, if any, is kept).
+    def clear(self):
+        self.entries.clear()
+
+    def close(self):
+        if self.database is not None:
+            self.database.close()
+            self.database = None
@@ -1,10 +1,12 @@
 # A class representing a state in our 8 puzzle game.
+# Importing our Board class, which packs boards into integers.
+from modules.Board import Board
 
 class State:
-    def __init__(self, state, rows=3, cols=3):
-        # The dimensions of our puzzle.
-        self.rows = rows
-        self.cols = cols
+    def __init__(self, state, rows=None, cols=None):
+        # The dimensions of our puzzle, taken from the board itself unless given.
+        self.rows = rows if rows is not None else len(state)
+        self.cols = cols if cols is not None else len(state[0])
         # Our state represented as a 2D array.
         self.state = state
         # The cost of our state.
@@ -98,6 +100,14 @@ class State:
         self.compute_heuristic_mt(goal_state)
         return self.hn
 
+    # Maps our state to the representative of its symmetry class (see Board.canonical) for the given goal.
+    # Returns (state, transposed): solutions of the representative map back to ours w/ Board.mirror_moves when
+    # transposed is True.
+    def canonical(self, goal_state):
+        board = Board(goal_state, self.rows, self.cols)
+        code, transposed = board.canonical(board.encode(self.state))
+        return State(board.decode(code), self.rows, self.cols), transposed
+
     # Setters and getters for the state.
     def set_state(self, state):
         self.state = state
@@ -0,0 +1,38 @@
+# A search strategy decides how g(n) and h(n) are combined into the priority of a state:
+#   priority = g_weight * g(n) + h_weight * h(n)
+
+class Strategy:
+    def __init__(self, name, g_weight=1, h_weight=1):
+        # The name of the strategy, used in reports.
+        self.name = name
+        # How much the cost so far and the heuristic estimate count towards a state's priority.
+        self.g_weight = g_weight
+        self.h_weight = h_weight
+
+    # Computes the priority of a state.
+    def priority(self, gn, hn):
+        return self.g_weight * gn + self.h_weight * hn
+
+    # Uniform Cost Search: only the cost so far is considered.
+    @classmethod
+    def ucs(cls):
+        return cls('ucs', 1, 0)
+
+    # A* search: f(n) = g(n) + h(n).
+    @classmethod
+    def astar(cls):
+        return cls('astar', 1, 1)
+
+    # Weighted A*: f(n) = g(n) + w * h(n). Faster, but solutions may be up to w times longer than optimal.
+    @classmethod
+    def weighted_astar(cls, weight):
+        # Weights below 1 would trust the heuristic less than UCS does, and negative ones would make priorities negative.
+        if not weight >= 1:
+            raise ValueError(f"The weight of weighted A* must be at least 1, got {weight}.")
+        return cls('wastar', 1, weight)
+
+    # Greedy best-first search: only the heuristic is considered.
+    @classmethod
+    def greedy(cls):
+        return cls('greedy', 0, 1)
+
@@ -0,0 +1,51 @@
+# The on-disk format shared by our precomputed tables (see PatternDatabase.py and DistanceTable.py): a header that
+# identifies the table (its magic bytes, then whatever the table needs to tell itself apart, e.g. the board shape and
+# goal layout), followed by one byte per entry.
+#
+# Files are written atomically and memory-mapped on load, so many solver processes share one copy in the page cache.
+# Each process also keeps the tables it has opened, so repeated solves (e.g. in a batch worker) share them.
+import mmap
+import os
+
+class TableFile:
+    # The directory tables are cached in when no path is given.
+    default_directory = 'tables'
+
+    # The first bytes of our file: our magic bytes and whatever else identifies the table.
+    def header(self):
+        raise NotImplementedError
+
+    # Returns the table this process opened under a key, opening it w/ create() first if needed.
+    # create may return None (e.g. when there is no table on disk), which we don't remember.
+    @classmethod
+    def reuse(cls, key, create):
+        if key not in cls.opened:
+            table = create()
+            if table is None:
+                return None
+            cls.opened[key] = table
+        return cls.opened[key]
+
+    # Writes our header and tables to self.path. We write to a temporary file first so readers never see a partial table.
+    def save(self, *tables):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(self.header())
+            for table in tables:
+                file.write(table)
+        os.replace(temp_path, self.path)
+
+    # Memory-maps self.path, returning a read-only view of everything after our header, or None if there is no file
+    # or it holds a different table.
+    def map_entries(self):
+        if not os.path.exists(self.path):
+            return None
+        header = self.header()
+        with open(self.path, 'rb') as file:
+            if file.read(len(header)) != header:
+                return None
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self.map)[len(header):]
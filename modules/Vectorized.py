@@ -0,0 +1,96 @@
+# Vectorized heuristics and child generation w/ NumPy, for scoring and expanding many boards in one call.
+# Boards are rows of an (N, rows*cols) uint8 array, and heuristics are lookups in a (tile, cell) cost table summed
+# along each row, so a whole batch or frontier layer costs a handful of array operations instead of N Python loops.
+# Packed boards (see Board.py) are handled as uint64 arrays, so expanding needs boards that fit in 64 bits
+# (the 8 and 15 puzzles do).
+import numpy as np
+
+class VectorHeuristic:
+    def __init__(self, board):
+        # The board layout (dimensions and goal) we are scoring boards for.
+        self.board = board
+        size = board.size
+        # Whether packed boards fit in a uint64.
+        self.packable = size * board.bits <= 64
+        # cost[tile, pos] is a tile's contribution to h(n) when it sits in cell pos (always 0 for the blank).
+        rows_of, cols_of = np.divmod(np.arange(size), board.cols)
+        goal = np.array(board.goal_pos[1:]).reshape(-1, 2)
+        goal_i, goal_j = goal[:, 0][:, None], goal[:, 1][:, None]
+        self.md_costs = np.zeros((size, size), np.int32)
+        self.md_costs[1:] = np.abs(rows_of - goal_i) + np.abs(cols_of - goal_j)
+        self.mt_costs = np.zeros((size, size), np.int32)
+        self.mt_costs[1:] = self.md_costs[1:] != 0
+        self.euc_costs = np.zeros((size, size), np.float64)
+        self.euc_costs[1:] = np.sqrt((rows_of - goal_i) ** 2 + (cols_of - goal_j) ** 2)
+        self.costs = {'md': self.md_costs, 'mt': self.mt_costs, 'euc': self.euc_costs}
+        self.positions = np.arange(size)
+        # The bit offset of every cell, and the neighbors of every cell padded to 4 w/ -1.
+        self.shifts = np.array(board.shifts, np.uint64)
+        self.neighbors = np.full((size, 4), -1, np.int64)
+        for pos, adjacent in enumerate(board.neighbors):
+            self.neighbors[pos, :len(adjacent)] = adjacent
+        # The factorials of Board.rank, as int64 (ranks of boards up to 4x5 fit).
+        self.factorials = np.array(board.factorials, np.int64)
+
+    # Turns a list of 2D boards into an (N, size) array of tiles.
+    def to_array(self, boards):
+        return np.array([self.board.flatten(state) for state in boards], np.uint8).reshape(-1, self.board.size)
+
+    # Unpacks an array of packed boards into an (N, size) array of tiles.
+    def unpack(self, codes):
+        self.check_packable()
+        codes = np.asarray(codes, np.uint64)
+        return ((codes[:, None] >> self.shifts) & np.uint64(self.board.mask)).astype(np.uint8)
+
+    # Packs an (N, size) array of tiles into an array of packed boards.
+    def pack(self, tiles):
+        self.check_packable()
+        return np.bitwise_or.reduce(tiles.astype(np.uint64) << self.shifts, axis=1)
+
+    def check_packable(self):
+        if not self.packable:
+            raise ValueError(f"Packed {self.board.rows}x{self.board.cols} boards don't fit in 64 bits.")
+
+    # Scores every row of an (N, size) array of tiles w/ the 'md', 'mt' or 'euc' heuristic.
+    def evaluate(self, tiles, name='md'):
+        if name not in self.costs:
+            raise ValueError(f"Unknown heuristic '{name}', expected one of {', '.join(self.costs)}.")
+        return self.costs[name][tiles, self.positions].sum(axis=1)
+
+    # Ranks every row of an (N, size) array of tiles, as Board.rank does one board.
+    def rank(self, tiles):
+        count = self.board.size - 1
+        blanks = np.argmin(tiles, axis=1)
+        lehmer = np.zeros(len(tiles), np.int64)
+        for pos in range(count + 1):
+            tile = tiles[:, pos:pos + 1]
+            later = tiles[:, pos + 1:]
+            # The tiles after this one that are smaller (the blank doesn't count), weighted by the factorial of the
+            # tiles left after it. Cells after the blank are one tile closer to the front.
+            smaller = ((later < tile) & (later > 0)).sum(axis=1)
+            index = pos - (blanks < pos)
+            weight = self.factorials[np.maximum(count - 1 - index, 0)]
+            lehmer += np.where(tile[:, 0] > 0, smaller * weight, 0)
+        return blanks * (self.factorials[count] // 2) + lehmer // 2
+
+    # Generates the children of an array of packed boards.
+    # Returns (parents, children, blanks): for every child, the index of its parent in codes, the packed child,
+    # and the cell its blank moved to.
+    def expand(self, codes):
+        codes = np.asarray(codes, np.uint64)
+        tiles = self.unpack(codes)
+        # Every tile is unique, so the blank (0) is the smallest tile on each board.
+        blanks = np.argmin(tiles, axis=1)
+        targets = self.neighbors[blanks]
+        parents, slot = np.nonzero(targets >= 0)
+        dst = targets[parents, slot]
+        src = blanks[parents]
+        # As the blank is stored as zero, sliding a tile only moves its bits across (see Board.slide).
+        moved = tiles[parents, dst].astype(np.uint64)
+        children = codes[parents] ^ (moved << self.shifts[dst]) ^ (moved << self.shifts[src])
+        return parents, children, dst
+
+    # Expands an array of packed boards and scores every child, returning (parents, children, blanks, h).
+    def expand_scored(self, codes, name='md'):
+        parents, children, blanks = self.expand(codes)
+        return parents, children, blanks, self.evaluate(self.unpack(children), name)
@@ -0,0 +1,37 @@
+# Runs our solve server (see modules/Server.py): newline-delimited JSON boards in, JSON results out.
+#
+# Example: echo '{"id": 1, "board": [[8,7,1],[6,0,2],[5,4,3]], "algorithm": "md"}' | python server.py
+#          python server.py --tcp 127.0.0.1:8765 --workers 4 --warm pdb,table --shapes 3x3,4x4
+import argparse
+import asyncio
+# Importing our SolveServer class.
+from modules.Server import SolveServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve puzzle solves as newline-delimited JSON over stdin/stdout or TCP.")
+    parser.add_argument('--tcp', metavar='HOST:PORT', help="listen on a local TCP address instead of stdin/stdout")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (defaults to the number of cores)")
+    parser.add_argument('--max-pending', type=int, default=None, help="the most requests in flight before we stop reading (defaults to 2 per worker)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="the default time limit of a request, in seconds")
+    parser.add_argument('--warm', default='', help="comma separated algorithms whose tables are opened up front, e.g. pdb,table")
+    parser.add_argument('--shapes', default='3x3', help="comma separated board shapes (rows x cols) we solve and open the --warm tables for, e.g. 3x3,4x4")
+    args = parser.parse_args()
+
+    shapes = [tuple(int(n) for n in shape.split('x')) for shape in args.shapes.split(',') if shape]
+    server = SolveServer(args.workers, args.max_pending, args.timeout, [name for name in args.warm.split(',') if name], shapes)
+    async def serve():
+        server.start()
+        if args.tcp:
+            host, port = args.tcp.rsplit(':', 1)
+            await server.serve_tcp(host, int(port))
+        else:
+            await server.serve_stdio()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == '__main__':
+    main()